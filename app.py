@@ -1,12 +1,12 @@
 import os
-from app import create_app, db
-from flask_migrate import upgrade
+from app import create_app
+from app.schema import ensure_schema
 app = create_app()
 
-# Push the app context when starting the server
+# Push the app context when starting the server. Workers skip the
+# migrations when the schema is already at head.
 with app.app_context():
-    db.create_all()
-    upgrade()
+    ensure_schema()
 
 """
 import os
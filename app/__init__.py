@@ -2,10 +2,17 @@ import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from sqlalchemy.engine import make_url
 from jinja2 import Environment, PackageLoader, select_autoescape
 from .dashboards import register_dash_apps
 from .routes import main
 from .db import db
+from .cache import init_cache
+from .importer import import_items_command
+from .metrics import init_metrics
+from .pool_metrics import InstrumentedQueuePool
+from .replica import init_read_replica
+from . import rollup  # noqa: F401 registers the item rollup flush listener
 
 migrate = Migrate()
 
@@ -28,6 +35,19 @@ def create_app():
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
     )
 
+    # Record connection wait times, except for in-memory SQLite which
+    # Flask-SQLAlchemy gives a single shared connection
+    engine_options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    database_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if not (database_url.get_backend_name() == 'sqlite' and database_url.database in (None, '', ':memory:')):
+        engine_options.setdefault('poolclass', InstrumentedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+    # Optional read replica bind, set up before the engines are created
+    init_read_replica(app)
+    init_cache(app)
+    init_metrics(app)
+
     app.register_blueprint(main)
 
     try:
@@ -42,6 +62,9 @@ def create_app():
     except Exception as e:
         print(f"Error registering Dash apps: {e}")
 
+    # flask import-items loads items from CSV or Parquet files
+    app.cli.add_command(import_items_command)
+
     # Register shell context processor
     @app.shell_context_processor
     def make_shell_context():
@@ -0,0 +1,195 @@
+import threading
+import time
+from collections import OrderedDict
+
+from .changes import on_projects_changed
+
+# Response cache for dashboard figures and read-only API responses. Values are
+# serialized strings; every entry is tagged with the projects (or user) it was
+# built from and dropped as soon as one of them changes.
+ALL_PROJECTS_TAG = 'projects'
+
+_backend = None
+
+
+def project_tag(project_id):
+    return f'project:{project_id}'
+
+
+def user_tag(username):
+    return f'user:{username}'
+
+
+class CacheStats:
+    # Hit and miss counters per kind of cached response
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+
+    def record(self, namespace, hit):
+        with self._lock:
+            counters = self.counters.setdefault(namespace, {"hits": 0, "misses": 0})
+            counters["hits" if hit else "misses"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {namespace: dict(counters) for namespace, counters in self.counters.items()}
+
+
+class LRUCache:
+    # In-process cache bounded by entry count, least recently used entries
+    # are evicted first and entries expire after ttl seconds
+    name = 'memory'
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._tags = {}
+
+    def get(self, namespace, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry[0] <= now:
+                self._remove((namespace, key))
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end((namespace, key))
+        self.stats.record(namespace, entry is not None)
+        return entry[1] if entry is not None else None
+
+    def set(self, namespace, key, value, tags=()):
+        with self._lock:
+            self._remove((namespace, key))
+            self._entries[(namespace, key)] = (time.monotonic() + self.ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                for entry_key in self._tags.pop(tag, ()):
+                    self._remove(entry_key)
+
+    def _remove(self, entry_key):
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(entry_key)
+                if not keys:
+                    del self._tags[tag]
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisCache:
+    # Cache shared by all workers. Each tag is a Redis set of the keys built
+    # from it. Redis errors are treated as misses so the app keeps serving.
+    name = 'redis'
+
+    def __init__(self, client, ttl=600, prefix='projectplanner:'):
+        import redis
+
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+        self._errors = redis.RedisError
+
+    def _key(self, namespace, key):
+        return f'{self.prefix}{namespace}:{key}'
+
+    def _tag_key(self, tag):
+        return f'{self.prefix}tag:{tag}'
+
+    def get(self, namespace, key):
+        try:
+            value = self.client.get(self._key(namespace, key))
+        except self._errors as e:
+            print(f"Cache read failed: {e}")
+            value = None
+        self.stats.record(namespace, value is not None)
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, namespace, key, value, tags=()):
+        entry_key = self._key(namespace, key)
+        try:
+            pipeline = self.client.pipeline()
+            pipeline.set(entry_key, value, ex=self.ttl)
+            for tag in tags:
+                pipeline.sadd(self._tag_key(tag), entry_key)
+                pipeline.expire(self._tag_key(tag), self.ttl)
+            pipeline.execute()
+        except self._errors as e:
+            print(f"Cache write failed: {e}")
+
+    def invalidate(self, tags):
+        try:
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                keys = self.client.smembers(tag_key)
+                self.client.delete(tag_key, *keys)
+        except self._errors as e:
+            print(f"Cache invalidation failed: {e}")
+
+    def size(self):
+        return None
+
+
+def create_backend(config):
+    # CACHELOCATION=redis://... selects Redis, anything else the in-process LRU
+    location = config.get('CACHELOCATION')
+    ttl = config.get('CACHE_TTL_SECONDS', 60)
+    if location and location.startswith(('redis://', 'rediss://', 'unix://')):
+        try:
+            import redis
+            return RedisCache(redis.Redis.from_url(location), ttl=ttl)
+        except ImportError:
+            print("CACHELOCATION is set but the redis package is not installed, using the in-process cache.")
+    return LRUCache(max_entries=config.get('CACHE_MAX_ENTRIES', 1024), ttl=ttl)
+
+
+def init_cache(app):
+    # CACHE_DISABLED turns caching off, e.g. for benchmarks of the uncached paths
+    global _backend
+    _backend = None if app.config.get('CACHE_DISABLED') else create_backend(app.config)
+
+
+def cached(namespace, key, build, tags=()):
+    # Cached string for key, otherwise build() is called and its string stored under tags
+    if _backend is None:
+        return build()
+    value = _backend.get(namespace, key)
+    if value is None:
+        value = build()
+        _backend.set(namespace, key, value, tags)
+    return value
+
+
+def invalidate_user(username):
+    # Project lists of a user change when a view is added for them
+    if _backend is not None:
+        _backend.invalidate([user_tag(username)])
+
+
+def cache_status():
+    if _backend is None:
+        return {"backend": None}
+    return {"backend": _backend.name, "entries": _backend.size(), "namespaces": _backend.stats.snapshot()}
+
+
+@on_projects_changed
+def invalidate_changed_projects(project_ids):
+    # Views of all projects depend on every project
+    if _backend is not None:
+        _backend.invalidate([project_tag(project_id) for project_id in project_ids] + [ALL_PROJECTS_TAG])
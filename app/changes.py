@@ -0,0 +1,83 @@
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from .models import Items, Projects, Views
+from .rollup import lock_rollup
+
+# Callbacks run with the set of changed project ids once a transaction commits
+_listeners = []
+
+
+def on_projects_changed(callback):
+    _listeners.append(callback)
+    return callback
+
+
+def mark_projects_changed(session, project_ids):
+    # Called from the flush listener and directly by writes that bypass the ORM,
+    # e.g. Core bulk inserts. The version bump is part of the same transaction.
+    # The projects' rollup lock is taken before their rows are locked by the
+    # update, the order every write path uses, so mixed writers cannot deadlock.
+    project_ids = set(project_ids)
+    projects = Projects.__table__
+    lock_rollup(session.connection(), project_ids)
+    session.connection().execute(
+        update(projects)
+        .where(projects.c.project_id.in_(project_ids))
+        .values(data_version=projects.c.data_version + 1)
+    )
+    session.info.setdefault('changed_projects', set()).update(project_ids)
+
+
+def get_project_version(session, project_id):
+    # None when the project does not exist
+    return session.execute(
+        select(Projects.data_version).where(Projects.project_id == project_id)
+    ).scalar()
+
+
+def get_projects_version(session, project_ids=None):
+    # Changes whenever any of the projects (all when None) is written, added or
+    # deleted. project_ids may also be a select of ids, e.g. of a user's views.
+    query = select(
+        func.count(),
+        func.coalesce(func.sum(Projects.data_version), 0),
+        func.coalesce(func.sum(Projects.project_id), 0),
+    )
+    if project_ids is not None:
+        query = query.where(Projects.project_id.in_(project_ids))
+    return tuple(session.execute(query).one())
+
+
+def touched_project_ids(obj):
+    if not isinstance(obj, (Items, Projects, Views)):
+        return set()
+
+    ids = {obj.project_id}
+    # An item or view moved to another project changes the old project too
+    history = inspect(obj).attrs.project_id.history
+    ids.update(history.deleted)
+    ids.discard(None)
+    return ids
+
+
+@event.listens_for(Session, 'after_flush')
+def collect_changed_projects(session, flush_context):
+    changed = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        changed |= touched_project_ids(obj)
+    if changed:
+        mark_projects_changed(session, changed)
+
+
+@event.listens_for(Session, 'after_commit')
+def notify_changed_projects(session):
+    changed = session.info.pop('changed_projects', None)
+    if changed:
+        for callback in _listeners:
+            callback(changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_changed_projects(session):
+    session.info.pop('changed_projects', None)
@@ -1,7 +1,70 @@
-from .overview_dash import init_overview_dash
-from .project_dash import init_project_dash
+import threading
 
-def register_dash_apps(app):
-    init_overview_dash(app)
-    init_project_dash(app)
+from flask import Flask
+
+DASH_PATH_PREFIX = '/dash/'
+
+
+def create_dash_server(app):
+    # The dashboards pull in pandas, plotly and dash, so they are only imported
+    # here, the first time a dashboard URL is requested
+    from ..metrics import init_metrics
+    from ..replica import init_read_replica
+    from .overview_dash import init_overview_dash
+    from .project_dash import init_project_dash
+
+    # Flask no longer accepts new routes once the main app has served a request,
+    # so the Dash apps get their own server with the same configuration
+    server = Flask(app.import_name)
+    server.config.from_mapping(app.config)
+    init_read_replica(server)
+    init_metrics(server)
+    share_database(app, server)
+
+    init_overview_dash(server)
+    init_project_dash(server)
+    return server
+
+
+def share_database(app, server):
+    # Register the server with the app's SQLAlchemy extension without
+    # db.init_app, which would create a second set of engines: the server
+    # uses the app's engines, so a worker keeps one connection pool per bind
+    # and the replica bind and pool limits stay shared. Flask-SQLAlchemy has
+    # no public way to hand over engines, hence _app_engines.
+    from ..db import db
 
+    with app.app_context():
+        engines = db.engines
+    db._app_engines[server] = engines
+    server.extensions['sqlalchemy'] = db
+
+    @server.teardown_appcontext
+    def remove_session(exception):
+        db.session.remove()
+
+
+class LazyDashboards:
+    # WSGI middleware sending /dash/ requests to the Dash server, which is
+    # built on first use; everything else goes to the Flask app as before
+    def __init__(self, app):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.server = None
+        self.lock = threading.Lock()
+
+    def get_server(self):
+        if self.server is None:
+            with self.lock:
+                if self.server is None:
+                    self.server = create_dash_server(self.app)
+        return self.server
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO', '').startswith(DASH_PATH_PREFIX):
+            return self.get_server().wsgi_app(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+
+def register_dash_apps(app):
+    app.wsgi_app = LazyDashboards(app)
@@ -0,0 +1,199 @@
+// Clientside callbacks for the project dashboard.
+// The server sends the project's items once as a columnar store; filtering,
+// grouping and building the timeline and monthly burn figures happen in the browser.
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+function dayNumber(isoDay) {
+    return Date.UTC(+isoDay.slice(0, 4), +isoDay.slice(5, 7) - 1, +isoDay.slice(8, 10)) / DAY_MS;
+}
+
+function isoMonth(day) {
+    return new Date(day * DAY_MS).toISOString().slice(0, 7);
+}
+
+// Prorated monthly cost and budget within the window, as burn.monthly_burn:
+// each item's daily rate goes into a difference array and a running sum
+// turns it into daily totals, which are then summed per month
+function monthlyBurn(items, start, end) {
+    const valid = items.filter(function (item) { return item.start && item.end && item.end >= item.start; });
+    if (!valid.length) {
+        return null;
+    }
+    const firstDay = start ? dayNumber(start) : Math.min.apply(null, valid.map(function (item) { return dayNumber(item.start); }));
+    const lastDay = end ? dayNumber(end) : Math.max.apply(null, valid.map(function (item) { return dayNumber(item.end); }));
+    const numDays = Math.max(lastDay - firstDay + 1, 0);
+
+    const burn = {months: [], cost: [], budget: []};
+    ["cost", "budget"].forEach(function (type) {
+        const changes = new Float64Array(numDays + 1);
+        valid.forEach(function (item) {
+            if (item.type !== type) return;
+            const from = dayNumber(item.start) - firstDay;
+            const to = dayNumber(item.end) - firstDay + 1;
+            const rate = item.amount / (to - from);
+            changes[Math.min(Math.max(from, 0), numDays)] += rate;
+            changes[Math.min(Math.max(to, 0), numDays)] -= rate;
+        });
+
+        let daily = 0;
+        let monthIndex = -1;
+        let month = null;
+        for (let day = 0; day < numDays; day++) {
+            daily += changes[day];
+            const dayMonth = isoMonth(firstDay + day);
+            if (dayMonth !== month) {
+                month = dayMonth;
+                monthIndex++;
+                if (type === "cost") burn.months.push(month);
+                burn[type].push(0);
+            }
+            burn[type][monthIndex] += daily;
+        }
+    });
+    return burn;
+}
+
+function buildBurn(items, start, end, template) {
+    const burn = monthlyBurn(items, start, end) || {months: [], cost: [], budget: []};
+    const data = [];
+    ["cost", "budget"].forEach(function (type) {
+        const label = type.charAt(0).toUpperCase() + type.slice(1);
+        let total = 0;
+        const cumulative = burn[type].map(function (amount) { total += amount; return total; });
+        data.push({
+            type: "bar",
+            x: burn.months,
+            y: burn[type].map(function (amount) { return Math.round(amount * 100) / 100; }),
+            name: "Monthly " + type,
+            marker: {color: template.burn_colors[type]},
+            opacity: 0.35,
+            hovertemplate: "%{x}<br>" + label + " this month: %{y:,.0f}<extra></extra>"
+        });
+        data.push({
+            type: "scatter",
+            x: burn.months,
+            y: cumulative.map(function (amount) { return Math.round(amount * 100) / 100; }),
+            name: "Cumulative " + type,
+            mode: "lines+markers",
+            line: {color: template.burn_colors[type], width: 3},
+            hovertemplate: "%{x}<br>" + label + " to date: %{y:,.0f}<extra></extra>"
+        });
+    });
+    // Layout rendered by figures.build_burn_figure on the server
+    return {data: data, layout: JSON.parse(JSON.stringify(template.burn_layout))};
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    projectDash: {
+        buildTimeline: function (store, startDate, endDate, categories, groupByCategory, viewMode, template) {
+            if (!store || !template) {
+                return {data: [], layout: {}};
+            }
+
+            const columns = store.columns;
+            const selected = categories && categories.length ? new Set(categories) : null;
+            const grouped = (groupByCategory || []).indexOf("group") >= 0;
+            // Dates are compared as ISO days, the picker may add a time part
+            const start = startDate ? startDate.slice(0, 10) : null;
+            const end = endDate ? endDate.slice(0, 10) : null;
+
+            // Keep items matching the category filter whose dates overlap the window
+            const rows = {cost: [], budget: []};
+            for (let i = 0; i < columns.amount.length; i++) {
+                const type = store.types[columns.type[i]];
+                const category = store.categories[columns.category[i]];
+                if (!(type in rows) || (selected && !selected.has(category))) {
+                    continue;
+                }
+                if ((end && (!columns.start[i] || columns.start[i] > end)) || (start && (!columns.end[i] || columns.end[i] < start))) {
+                    continue;
+                }
+                rows[type].push({
+                    type: type,
+                    name: columns.name[i],
+                    amount: columns.amount[i],
+                    category: category,
+                    start: columns.start[i],
+                    end: columns.end[i]
+                });
+            }
+
+            if (viewMode === "burn") {
+                return buildBurn(rows.cost.concat(rows.budget), start, end, template);
+            }
+
+            // Group by category if the group-by-category option is selected
+            function groupRows(items, suffix) {
+                const groups = {};
+                items.forEach(function (item) {
+                    const group = groups[item.category];
+                    if (!group) {
+                        groups[item.category] = Object.assign({}, item, {name: item.category + suffix});
+                        return;
+                    }
+                    group.amount += item.amount;
+                    if (item.start && (!group.start || item.start < group.start)) group.start = item.start;
+                    if (item.end && (!group.end || item.end > group.end)) group.end = item.end;
+                });
+                return Object.keys(groups).sort().map(function (key) { return groups[key]; });
+            }
+
+            const cost = grouped ? groupRows(rows.cost, " (Cost)") : rows.cost;
+            const budget = grouped ? groupRows(rows.budget, " (Budget)") : rows.budget;
+
+            function barTrace(items, axis) {
+                return {
+                    type: "bar",
+                    orientation: "h",
+                    x: items.map(function (item) { return item.amount; }),
+                    y: items.map(function (item) { return item.name; }),
+                    marker: {color: items.map(function (item) { return template.colors[item.category] || template.default_color; })},
+                    customdata: items.map(function (item) { return item.category; }),
+                    hovertemplate: "%{y}<br>%{customdata}: %{x}<extra></extra>",
+                    text: items.map(function (item) { return item.start && item.end ? item.start + " - " + item.end : ""; }),
+                    textposition: "inside",
+                    showlegend: false,
+                    xaxis: "x" + axis,
+                    yaxis: "y" + axis
+                };
+            }
+
+            function total(items) {
+                return items.reduce(function (sum, item) { return sum + item.amount; }, 0);
+            }
+
+            // Net position and its color, as in figures.net_position
+            const totalBudget = total(budget);
+            const netValue = totalBudget - total(cost);
+            let netColor = "blue";
+            if (netValue < 0) {
+                netColor = "red";
+            } else if (netValue > 0.8 * totalBudget) {
+                netColor = "green";
+            }
+
+            const data = [];
+            if (cost.length) data.push(barTrace(cost, ""));
+            if (budget.length) data.push(barTrace(budget, "2"));
+            data.push({
+                type: "bar",
+                orientation: "h",
+                x: [netValue],
+                y: ["Net Position"],
+                name: "Net Position",
+                marker: {color: netColor},
+                showlegend: false,
+                xaxis: "x3",
+                yaxis: "y3"
+            });
+
+            // Subplot layout rendered by figures.build_timeline_figure on the server
+            const layout = JSON.parse(JSON.stringify(template.layout));
+            layout.height = Math.max(400, (cost.length + budget.length + 1) * 100);
+            layout.yaxis.tickvals = cost.map(function (_, index) { return index; });
+            layout.yaxis2.tickvals = budget.map(function (_, index) { return index; });
+
+            return {data: data, layout: layout};
+        }
+    }
+});
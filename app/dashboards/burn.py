@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+BURN_TYPES = ("cost", "budget")
+BURN_COLUMNS = ["Month", "cost", "budget", "cumulative cost", "cumulative budget"]
+
+
+def daily_spread(starts, ends, amounts, first_day, num_days):
+    # Spread each amount evenly over its days, start and end inclusive, and
+    # return the totals for the num_days days from first_day. Each item adds
+    # its daily rate to a difference array where it starts and removes it
+    # where it ends; the cumulative sum turns that into daily totals. Days
+    # outside the range are clipped away, the rate still uses the full span.
+    start_index = (starts - first_day).astype(np.int64)
+    end_index = (ends - first_day).astype(np.int64) + 1
+    rates = amounts / (end_index - start_index)
+
+    start_index = np.clip(start_index, 0, num_days)
+    end_index = np.clip(end_index, 0, num_days)
+    changes = (np.bincount(start_index, weights=rates, minlength=num_days + 1)
+               - np.bincount(end_index, weights=rates, minlength=num_days + 1))
+    return np.cumsum(changes)[:num_days]
+
+
+def monthly_burn(df, start_date=None, end_date=None):
+    # Prorated monthly cost and budget of the items in df within the window,
+    # with running totals. The window defaults to the span of the items.
+    starts = df["Start Date"].to_numpy().astype("datetime64[D]")
+    ends = df["End Date"].to_numpy().astype("datetime64[D]")
+    valid = ~np.isnat(starts) & ~np.isnat(ends) & (ends >= starts)
+    if not valid.any():
+        return pd.DataFrame(columns=BURN_COLUMNS)
+
+    first_day = np.datetime64(pd.Timestamp(start_date).date(), "D") if start_date else starts[valid].min()
+    last_day = np.datetime64(pd.Timestamp(end_date).date(), "D") if end_date else ends[valid].max()
+    num_days = max(int((last_day - first_day).astype(np.int64)) + 1, 0)
+
+    days = first_day + np.arange(num_days)
+    first_month = first_day.astype("datetime64[M]")
+    month_index = (days.astype("datetime64[M]") - first_month).astype(np.int64)
+    num_months = int(month_index[-1]) + 1 if num_days else 0
+
+    burn = {"Month": (first_month + np.arange(num_months)).astype(str)}
+    amounts = df["Amount"].to_numpy(dtype=np.float64, na_value=0)
+    types = df["Type"].to_numpy(dtype=object)
+    for item_type in BURN_TYPES:
+        selected = valid & (types == item_type)
+        daily = daily_spread(starts[selected], ends[selected], amounts[selected], first_day, num_days)
+        burn[item_type] = np.bincount(month_index, weights=daily, minlength=num_months)[:num_months]
+        burn[f"cumulative {item_type}"] = np.cumsum(burn[item_type])
+
+    return pd.DataFrame(burn, columns=BURN_COLUMNS)
@@ -0,0 +1,267 @@
+import re
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, or_, select
+
+from ..replica import read_session
+from ..models import ItemRollup, Items, Projects
+from ..rollup import month_start, next_month
+
+
+# Columns selected for the dashboards, keyed by their DataFrame column name
+ITEM_COLUMNS = {
+    "Project": Projects.project_name,
+    "Item Name": Items.item_name,
+    "Type": Items.type,
+    "Amount": Items.amount,
+    "Category": Items.category,
+    "Start Date": Items.item_start_date,
+    "End Date": Items.item_end_date,
+}
+
+# Low-cardinality labels are stored once per frame as categoricals
+CATEGORICAL_COLUMNS = ("Project", "Type", "Category")
+DATE_COLUMNS = ("Start Date", "End Date")
+
+# Rows per fetch when aggregating items from a server-side cursor
+AGGREGATE_CHUNK_SIZE = 10_000
+GROUPED_AGGREGATIONS = {"Amount": "sum", "Start Date": "min", "End Date": "max"}
+GROUPED_COLUMNS = ["Type", "Category", "Amount", "Start Date", "End Date"]
+GROUPED_ITEM_COLUMNS = (Items.type, Items.category, Items.amount, Items.item_start_date, Items.item_end_date)
+
+# Labels of the bars that stand in for items outside the rendered range
+BUCKET_LABEL = re.compile(r"^(other|higher-ranked) (cost|budget) \((\d+) items\)$")
+
+
+def to_datetime(value):
+    # Date pickers send ISO strings, project defaults come back as datetimes
+    if value is None:
+        return None
+    return pd.to_datetime(value).to_pydatetime()
+
+
+def filter_items(query, project_ids=None, start_date=None, end_date=None, categories=None, types=None):
+    # Translate the dashboard filter state into WHERE clauses so only matching rows are fetched
+    if project_ids is not None:
+        query = query.filter(Items.project_id.in_(project_ids))
+    if categories:
+        query = query.filter(Items.category.in_(categories))
+    if types:
+        query = query.filter(Items.type.in_(types))
+
+    # Keep items whose date range overlaps the selected window
+    if end_date is not None:
+        query = query.filter(Items.item_start_date <= to_datetime(end_date))
+    if start_date is not None:
+        query = query.filter(Items.item_end_date >= to_datetime(start_date))
+
+    return query
+
+
+def items_query(project_ids=None, start_date=None, end_date=None, categories=None, types=None):
+    query = read_session().query(*ITEM_COLUMNS.values()).join(Projects, Items.project_id == Projects.project_id)
+    return filter_items(query, project_ids, start_date, end_date, categories, types)
+
+
+def items_frame(rows, names=tuple(ITEM_COLUMNS)):
+    # Build each column straight from the raw result tuples into a typed array:
+    # categoricals for labels, datetime64 for dates and int64 for amounts
+    values = dict(zip(names, zip(*rows))) if rows else dict.fromkeys(names, ())
+
+    columns = {}
+    for name, column in values.items():
+        if name in CATEGORICAL_COLUMNS:
+            columns[name] = pd.Categorical(column)
+        elif name in DATE_COLUMNS:
+            columns[name] = pd.to_datetime(pd.Series(column, dtype=object))
+        elif name == "Amount":
+            columns[name] = np.fromiter((amount or 0 for amount in column), dtype=np.int64, count=len(column))
+        else:
+            columns[name] = np.array(column, dtype=object)
+    return pd.DataFrame(columns)
+
+
+def load_items_frame(project_ids=None, start_date=None, end_date=None, categories=None, types=None):
+    # Core execution returns plain tuples without ORM row processing
+    query = items_query(project_ids, start_date, end_date, categories, types)
+    return items_frame(read_session().execute(query.statement).all())
+
+
+def load_burn_frame(project_ids=None, start_date=None, end_date=None, categories=None, types=None):
+    # Only the columns the monthly burn needs
+    names = ("Type", "Amount", "Start Date", "End Date")
+    statement = filter_items(
+        select(*(ITEM_COLUMNS[name] for name in names)),
+        project_ids, start_date, end_date, categories, types
+    )
+    return items_frame(read_session().execute(statement).all(), names)
+
+
+def load_project_store(project_id, version):
+    # Compact columnar copy of a project's items for the browser: types and
+    # categories are sent once and referenced by index, dates as ISO days
+    rows = read_session().query(
+        Items.item_name, Items.type, Items.amount, Items.category, Items.item_start_date, Items.item_end_date
+    ).filter(Items.project_id == project_id).order_by(Items.item_id).all()
+
+    types, categories = {}, {}
+    columns = {"name": [], "type": [], "amount": [], "category": [], "start": [], "end": []}
+    for name, item_type, amount, category, start, end in rows:
+        columns["name"].append(name)
+        columns["type"].append(types.setdefault(item_type, len(types)))
+        columns["amount"].append(amount or 0)
+        columns["category"].append(categories.setdefault(category, len(categories)))
+        columns["start"].append(start.strftime('%Y-%m-%d') if start else None)
+        columns["end"].append(end.strftime('%Y-%m-%d') if end else None)
+
+    return {
+        "project_id": project_id,
+        "version": version,
+        "types": list(types),
+        "categories": list(categories),
+        "columns": columns,
+    }
+
+
+def split_by_type(df, group_by_category):
+    cost_df = df[df["Type"] == "cost"]
+    budget_df = df[df["Type"] == "budget"]
+
+    # Group by category if the group-by-category option is selected
+    if group_by_category:
+        aggregations = {"Amount": "sum", "Start Date": "min", "End Date": "max"}
+        cost_df = cost_df.groupby("Category", observed=True).agg(aggregations).reset_index()
+        budget_df = budget_df.groupby("Category", observed=True).agg(aggregations).reset_index()
+
+        # Modify item names for grouped data
+        cost_df["Item Name"] = cost_df["Category"].astype(str) + " (Cost)"
+        budget_df["Item Name"] = budget_df["Category"].astype(str) + " (Budget)"
+
+    return cost_df, budget_df
+
+
+def bucket_row(df, label):
+    return pd.DataFrame({
+        "Item Name": [label],
+        "Amount": [df["Amount"].sum()],
+        "Category": [""],
+        "Start Date": [df["Start Date"].min()],
+        "End Date": [df["End Date"].max()],
+    })
+
+
+def cap_bars(df, limit, offset=0, item_type="items"):
+    # Keep the items ranked offset..offset+limit by amount and roll the items
+    # ranked above and below into one bucket bar each, so the number of bars
+    # and the figure size stay bounded
+    if len(df) <= limit and not offset:
+        return df
+
+    ranked = df.sort_values("Amount", ascending=False, kind="stable")
+    offset = min(offset, max(len(ranked) - limit, 0))
+    higher, lower = ranked.iloc[:offset], ranked.iloc[offset + limit:]
+
+    parts = []
+    if len(higher):
+        parts.append(bucket_row(higher, f"higher-ranked {item_type} ({len(higher)} items)"))
+    parts.append(ranked.iloc[offset:offset + limit])
+    if len(lower):
+        parts.append(bucket_row(lower, f"other {item_type} ({len(lower)} items)"))
+    return pd.concat(parts, ignore_index=True)
+
+
+def clicked_bucket(click_data):
+    # ("other" or "higher-ranked", item type) for a click on a bucket bar, None otherwise
+    points = (click_data or {}).get("points") or []
+    match = BUCKET_LABEL.match(str(points[0].get("y", ""))) if points else None
+    return match.group(1, 2) if match else None
+
+
+def load_rollup_frames(project_ids=None, start_date=None, end_date=None, categories=None, types=None):
+    # Grouped totals read from the monthly rollup instead of raw items, so the
+    # cost depends on the number of categories and months, not items. Only
+    # months wholly inside the date window are taken from the rollup: every
+    # item of such a bucket overlaps the window. Items starting in the months
+    # at the window's edges or before it are aggregated from items, so the
+    # totals match stream_grouped_frames exactly.
+    start_date, end_date = to_datetime(start_date), to_datetime(end_date)
+    first_month = None if start_date is None else month_start(start_date)
+    if first_month is not None and first_month < start_date:
+        first_month = next_month(first_month)
+    last_month = None if end_date is None else month_start(end_date)
+
+    query = read_session().query(
+        ItemRollup.type.label("Type"),
+        ItemRollup.category.label("Category"),
+        func.sum(ItemRollup.amount).label("Amount"),
+        func.min(ItemRollup.min_start_date).label("Start Date"),
+        func.max(ItemRollup.max_end_date).label("End Date"),
+    )
+    if project_ids is not None:
+        query = query.filter(ItemRollup.project_id.in_(project_ids))
+    if categories:
+        query = query.filter(ItemRollup.category.in_(categories))
+    if types:
+        query = query.filter(ItemRollup.type.in_(types))
+    if first_month is not None:
+        query = query.filter(ItemRollup.month >= first_month)
+    if last_month is not None:
+        query = query.filter(ItemRollup.month < last_month)
+
+    rows = query.group_by(ItemRollup.type, ItemRollup.category).all()
+    totals = pd.DataFrame.from_records(rows, columns=GROUPED_COLUMNS)
+
+    edges = []
+    if first_month is not None:
+        edges.append(Items.item_start_date < first_month)
+    if last_month is not None:
+        edges.append(Items.item_start_date >= last_month)
+    if edges:
+        statement = filter_items(select(*GROUPED_ITEM_COLUMNS), project_ids, start_date, end_date, categories, types)
+        edge_totals = aggregate_items(statement.where(or_(*edges)))
+        if not edge_totals.empty:
+            totals = pd.concat([totals, edge_totals]).groupby(["Type", "Category"]).agg(GROUPED_AGGREGATIONS)
+            totals = totals.reset_index()
+
+    return grouped_frames(totals.sort_values("Category", kind="stable"))
+
+
+def aggregate_items(statement, chunk_size=AGGREGATE_CHUNK_SIZE):
+    # Per type and category totals of the selected items. Rows arrive in
+    # chunks from a server-side cursor and each chunk's sums and min/max dates
+    # are merged into the running totals, so memory stays bounded by the chunk
+    # size and the number of categories rather than the number of items.
+    totals = None
+    for chunk in read_session().execute(statement.execution_options(yield_per=chunk_size)).partitions():
+        df = pd.DataFrame.from_records(chunk, columns=GROUPED_COLUMNS)
+        partial = df.groupby(["Type", "Category"]).agg(GROUPED_AGGREGATIONS)
+        if totals is not None:
+            partial = pd.concat([totals, partial]).groupby(level=["Type", "Category"]).agg(GROUPED_AGGREGATIONS)
+        totals = partial
+
+    if totals is None:
+        return pd.DataFrame(columns=GROUPED_COLUMNS)
+    return totals.reset_index()
+
+
+def stream_grouped_frames(project_ids=None, start_date=None, end_date=None, categories=None, types=None,
+                          chunk_size=AGGREGATE_CHUNK_SIZE):
+    # Exact grouped totals aggregated from the matching items in bounded memory
+    statement = filter_items(select(*GROUPED_ITEM_COLUMNS), project_ids, start_date, end_date, categories, types)
+    totals = aggregate_items(statement, chunk_size)
+    return grouped_frames(totals.sort_values("Category", kind="stable"))
+
+
+def grouped_frames(df):
+    # Split per-type category totals into the cost and budget frames the figure expects
+    df["Amount"] = df["Amount"].fillna(0).astype("int64")
+    df["Start Date"] = pd.to_datetime(df["Start Date"])
+    df["End Date"] = pd.to_datetime(df["End Date"])
+
+    cost_df = df[df["Type"] == "cost"].drop(columns="Type").reset_index(drop=True)
+    budget_df = df[df["Type"] == "budget"].drop(columns="Type").reset_index(drop=True)
+    cost_df["Item Name"] = cost_df["Category"] + " (Cost)"
+    budget_df["Item Name"] = budget_df["Category"] + " (Budget)"
+
+    return cost_df, budget_df
@@ -0,0 +1,207 @@
+import hashlib
+import json
+
+import pandas as pd
+import plotly.graph_objects as go
+from dash import Patch
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+from .burn import BURN_COLUMNS
+
+
+# Map category names to hex color codes
+CATEGORY_COLORS = {
+    "consultancy services": "#1f77b4",
+    "licenses": "#ff7f0e",
+    "operations": "#2ca02c",
+    "business travels": "#d62728",
+    "internal FTE": "#9467bd",
+    "other": "#8c564b"
+}
+NET_COLORS = {
+    "Net Position Negative": "red",
+    "Net Position within 80-100% of budget": "green",
+    "Net Position <80% of budget": "blue"
+}
+DEFAULT_COLOR = "#333333"
+BURN_COLORS = {"cost": "#d62728", "budget": "#2ca02c"}
+# Trace properties that follow the data; everything else is the figure's structure
+PATCHABLE_TRACE_KEYS = ("x", "y", "text", "customdata")
+
+
+def net_position(cost_df, budget_df):
+    # Calculate net position based on filtered budgets and costs
+    total_budget = budget_df["Amount"].sum()
+    net_value = total_budget - cost_df["Amount"].sum()
+
+    # Determine net position color
+    if net_value < 0:
+        net_color = "red"
+    elif net_value > 0.8 * total_budget:
+        net_color = "green"
+    else:
+        net_color = "blue"
+
+    return net_value, net_color
+
+
+def bar_trace(df):
+    # One horizontal bar trace for a whole subplot: colors and date-range labels
+    # are computed column-wise instead of adding one trace per row
+    colors = df["Category"].astype(object).map(CATEGORY_COLORS).fillna(DEFAULT_COLOR)
+    text = df["Start Date"].dt.strftime('%Y-%m-%d') + " - " + df["End Date"].dt.strftime('%Y-%m-%d')
+    text = text.fillna("")
+
+    return go.Bar(
+        x=df["Amount"].to_numpy(),
+        y=df["Item Name"].to_numpy(),
+        orientation='h',
+        marker_color=colors.to_numpy(),
+        customdata=df["Category"].to_numpy(),
+        hovertemplate="%{y}<br>%{customdata}: %{x}<extra></extra>",
+        showlegend=False,
+        text=text.to_numpy(),
+        textposition='inside'
+    )
+
+
+def build_timeline_figure(cost_df, budget_df, net_value, net_color):
+    # Create subplots with shared x-axis
+    # Fixed bar height and dynamic figure height calculation
+    fixed_bar_height = 100  # Set a fixed height for each bar
+    num_items = len(cost_df) + len(budget_df) + 1  # +1 for Net Position bar
+    fig_height = max(400, num_items * fixed_bar_height)
+
+    fig = make_subplots(
+        rows=3,
+        cols=1,
+        shared_xaxes=True,
+        subplot_titles=("Cost Items", "Budget Items", "Net Position"),
+        vertical_spacing=0.1  # Adjust spacing between subplots
+    )
+
+    # Add cost and budget items as horizontal bars with category-based coloring
+    if len(cost_df):
+        fig.add_trace(bar_trace(cost_df), row=1, col=1)
+    if len(budget_df):
+        fig.add_trace(bar_trace(budget_df), row=2, col=1)
+
+    # Add net position as a horizontal bar
+    fig.add_trace(go.Bar(
+        x=[net_value],
+        y=["Net Position"],
+        orientation='h',
+        name="Net Position",
+        marker_color=net_color,
+        showlegend=False
+    ), row=3, col=1)
+
+    # Update layout to ensure shared x-axis and correct ordering of subplots
+    fig.update_layout(
+        height=fig_height,  # Set dynamic figure height based on the number of items
+        barmode="stack",
+        xaxis_title="Amount",
+        yaxis_title="Items",
+        title="Project Costs, Budgets, and Net Position",
+        bargap=0.2,
+        font=dict(size=12),
+        yaxis1=dict(
+            tickmode='array',
+            tickvals=list(range(len(cost_df))),
+            automargin=True,
+            dtick=1
+        ),
+        yaxis2=dict(
+            tickmode='array',
+            tickvals=list(range(len(budget_df))),
+            automargin=True,
+            dtick=1
+        ),
+        yaxis3=dict(
+            tickmode='array',
+            tickvals=[0],
+            automargin=True,
+            dtick=1
+        )
+    )
+
+    return fig
+
+
+def build_burn_figure(burn):
+    # Cumulative cost against cumulative budget per month, monthly amounts as bars
+    fig = go.Figure()
+    for item_type in ("cost", "budget"):
+        label = item_type.capitalize()
+        fig.add_trace(go.Bar(
+            x=burn["Month"].to_numpy(),
+            y=burn[item_type].round(2).to_numpy(),
+            name=f"Monthly {item_type}",
+            marker_color=BURN_COLORS[item_type],
+            opacity=0.35,
+            hovertemplate=f"%{{x}}<br>{label} this month: %{{y:,.0f}}<extra></extra>"
+        ))
+        fig.add_trace(go.Scatter(
+            x=burn["Month"].to_numpy(),
+            y=burn[f"cumulative {item_type}"].round(2).to_numpy(),
+            name=f"Cumulative {item_type}",
+            mode="lines+markers",
+            line=dict(color=BURN_COLORS[item_type], width=3),
+            hovertemplate=f"%{{x}}<br>{label} to date: %{{y:,.0f}}<extra></extra>"
+        ))
+
+    fig.update_layout(
+        height=500,
+        barmode="group",
+        title="Monthly Burn: Cumulative Cost against Budget",
+        xaxis_title="Month",
+        yaxis_title="Amount",
+        xaxis=dict(type="category"),
+        font=dict(size=12),
+        legend=dict(orientation="h", y=-0.2)
+    )
+    return fig
+
+
+def figure_signature(fig):
+    # Hash of a serialized figure without its patchable data: two figures with
+    # the same signature differ only in values a Patch can replace
+    structure = {
+        "layout": fig.get("layout"),
+        "data": [
+            dict({key: value for key, value in trace.items() if key not in PATCHABLE_TRACE_KEYS},
+                 marker={key: value for key, value in trace.get("marker", {}).items() if key != "color"})
+            for trace in fig.get("data", [])
+        ],
+    }
+    return hashlib.sha1(json.dumps(structure, sort_keys=True).encode()).hexdigest()
+
+
+def patch_figure(fig):
+    # Patch turning a displayed figure with the same signature into fig: only
+    # the trace data arrays and bar colors are sent, and the x axes rescale
+    patch = Patch()
+    for index, trace in enumerate(fig.get("data", [])):
+        for key in PATCHABLE_TRACE_KEYS:
+            patch["data"][index][key] = trace.get(key)
+        if "color" in trace.get("marker", {}):
+            patch["data"][index]["marker"]["color"] = trace["marker"]["color"]
+    for axis in fig.get("layout", {}):
+        if axis.startswith("xaxis"):
+            patch["layout"][axis]["autorange"] = True
+    return patch
+
+
+def figure_template():
+    # Layouts of the empty timeline and burn figures plus the color maps, for
+    # the clientside figure builders in assets/project_dash.js
+    fig = build_timeline_figure(pd.DataFrame(), pd.DataFrame(), 0, "blue")
+    burn_fig = build_burn_figure(pd.DataFrame(columns=BURN_COLUMNS))
+    return {
+        "layout": json.loads(pio.to_json(fig))["layout"],
+        "burn_layout": json.loads(pio.to_json(burn_fig))["layout"],
+        "colors": CATEGORY_COLORS,
+        "default_color": DEFAULT_COLOR,
+        "burn_colors": BURN_COLORS,
+    }
@@ -1,27 +1,26 @@
-from dash import Dash, html, dcc, Input, Output, no_update, State
+import json
+
+from flask import current_app
+from dash import ctx, Dash, html, dcc, Input, Output, no_update, State
 from flask_sqlalchemy import SQLAlchemy
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
 from urllib.parse import urlparse, parse_qs
 from ..db import db
-from ..models import Items, Projects
+from ..cache import ALL_PROJECTS_TAG, cached, project_tag
+from ..changes import get_projects_version
+from ..query_budget import max_queries
+from ..replica import read_session
+from ..single_flight import create_single_flight, flight_key
+from ..models import Projects
+from .burn import monthly_burn
+from .data import cap_bars, clicked_bucket, load_burn_frame, load_items_frame, load_rollup_frames, split_by_type, stream_grouped_frames
+from .figures import (
+    CATEGORY_COLORS, NET_COLORS, net_position, build_burn_figure, build_timeline_figure, figure_signature, patch_figure
+)
+
 
+NO_OFFSETS = {"cost": 0, "budget": 0}
 
-# Map category names to hex color codes
-CATEGORY_COLORS = {
-    "consultancy services": "#1f77b4",
-    "licenses": "#ff7f0e",
-    "operations": "#2ca02c",
-    "business travels": "#d62728",
-    "internal FTE": "#9467bd",
-    "other": "#8c564b"
-}
-NET_COLORS = {
-    "Net Position Negative": "red",
-    "Net Position within 80-100% of budget": "green",
-    "Net Position <80% of budget": "blue"
-}
 
 def init_overview_dash(server):
     dash_app = Dash(
@@ -30,6 +29,9 @@ def init_overview_dash(server):
         url_base_pathname="/dash/overview/"
     )
 
+    # Coalesces identical concurrent figure computations, None when disabled
+    flight = create_single_flight(server.config, server.instance_path)
+
     # Layout for the dashboard
     dash_app.layout = html.Div([
         dcc.Location(id='url', refresh=False),
@@ -74,6 +76,16 @@ def init_overview_dash(server):
             options=[{"label": "Group by Category", "value": "group"}],
             value=["group"]
         ),
+        dcc.RadioItems(
+            id="view-mode",
+            options=[
+                {"label": "Timeline", "value": "timeline"},
+                {"label": "Monthly burn", "value": "burn"},
+            ],
+            value="timeline",
+            inline=True,
+            style={"margin-bottom": "20px"}
+        ),
         html.Div(
             [
                 html.Div(
@@ -99,7 +111,11 @@ def init_overview_dash(server):
             ],
             style={"margin-bottom": "20px", "display": "flex", "flex-wrap": "wrap"}
         ),
-        dcc.Graph(id="timeline-graph")
+        dcc.Graph(id="timeline-graph"),
+        # First rendered rank per subplot; clicking a bucket bar moves through the ranks
+        dcc.Store(id="bar-offsets", data=dict(NO_OFFSETS)),
+        # Structure of the displayed figure, see figures.figure_signature
+        dcc.Store(id="figure-signature")
     ])
 
     # Callback to update the project dropdown
@@ -107,185 +123,132 @@ def init_overview_dash(server):
         Output("project-dropdown", "options"),
         Input("url", "href")
     )
+    @max_queries(1)
     def update_project_dropdown(href):
-        projects = db.session.query(Projects.project_id, Projects.project_name).all()
+        projects = read_session().query(Projects.project_id, Projects.project_name).all()
         return [{"label": name, "value": project_id} for project_id, name in projects]
 
     # Callback to update the graph
     @dash_app.callback(
         [Output("timeline-graph", "figure"),
          Output("date-picker-range", "start_date"),
-         Output("date-picker-range", "end_date")],
+         Output("date-picker-range", "end_date"),
+         Output("bar-offsets", "data"),
+         Output("figure-signature", "data")],
         [Input("project-dropdown", "value"),
          Input("date-picker-range", "start_date"),
          Input("date-picker-range", "end_date"),
          Input("category-dropdown", "value"),
          Input("label-dropdown", "value"),
-         Input("group-by-category", "value")]
+         Input("group-by-category", "value"),
+         Input("view-mode", "value"),
+         Input("timeline-graph", "clickData")],
+        [State("bar-offsets", "data"),
+         State("figure-signature", "data")]
     )
-    def update_dashboard(project_ids, start_date, end_date, categories, labels, group_by_category):
-        if not project_ids or "all" in project_ids:
-            project_ids = [project.project_id for project in db.session.query(Projects.project_id).all()]
+    # Data version, project dates and the figure's query; the grouped rollup
+    # source adds one for the items at the edges of the date window
+    @max_queries(4)
+    def update_dashboard(project_ids, start_date, end_date, categories, labels, group_by_category, view_mode,
+                         click_data, offsets, displayed_signature):
+        # At most this many items are drawn per subplot, the rest are bucketed
+        max_bars = current_app.config.get('OVERVIEW_MAX_BARS', 25)
+
+        if ctx.triggered_id == "timeline-graph":
+            # Drill into a bucket: the next (or previous) max_bars items of that subplot
+            bucket = clicked_bucket(click_data)
+            if bucket is None:
+                return no_update, no_update, no_update, no_update, no_update
+            direction, item_type = bucket
+            offsets = dict(offsets or NO_OFFSETS)
+            step = max_bars if direction == "other" else -max_bars
+            offsets[item_type] = max(offsets.get(item_type, 0) + step, 0)
+        else:
+            # Any filter change starts again from the top items
+            offsets = dict(NO_OFFSETS)
 
-        # Query only items related to the selected projects
-        items = db.session.query(Items, Projects.project_name).join(Projects).filter(Projects.project_id.in_(project_ids)).all()
+        # No selection or "All Projects" means no project filter at all
+        if not project_ids or "all" in project_ids:
+            project_ids = None
 
         # Get min and max project dates
-        project_dates = db.session.query(
+        project_dates = read_session().query(
             db.func.min(Projects.proj_start_date),
             db.func.max(Projects.proj_end_date)
         ).first()
 
         # Set default start and end dates if not provided
+        dates_defaulted = not start_date or not end_date
         if not start_date:
-            start_date = project_dates[0] if project_dates else "2025-01-01"
+            start_date = project_dates[0] if project_dates and project_dates[0] else "2025-01-01"
         if not end_date:
-            end_date = project_dates[1] if project_dates else "2026-12-31"
-
-        if not items:
-            return go.Figure(), start_date, end_date
-
-
-        # Convert items to a DataFrame
-        df = pd.DataFrame([{
-            "Project": project_name,
-            "Item Name": item.item_name,
-            "Type": item.type,
-            "Amount": item.amount,
-            "Category": item.category,
-            "Start Date": item.item_start_date,
-            "End Date": item.item_end_date
-        } for item, project_name in items])
-
-        # Apply category filter if categories are selected
-        if categories:
-            filtered_df = df[df["Category"].isin(categories)]
-        else:
-            filtered_df = df
-
-        # Group by category if the group-by-category option is selected
-        if "group" in group_by_category:
-            cost_df = filtered_df[filtered_df["Type"] == "cost"].groupby("Category").agg({
-                "Amount": "sum",
-                "Start Date": "min",
-                "End Date": "max"
-            }).reset_index()
-
-            budget_df = filtered_df[filtered_df["Type"] == "budget"].groupby("Category").agg({
-                "Amount": "sum",
-                "Start Date": "min",
-                "End Date": "max"
-            }).reset_index()
-
-            # Modify item names for grouped data
-            cost_df["Item Name"] = cost_df["Category"] + " (Cost)"
-            budget_df["Item Name"] = budget_df["Category"] + " (Budget)"
-        else:
-            cost_df = filtered_df[(filtered_df["Type"] == "cost") & ((filtered_df["Start Date"] <= end_date) & (filtered_df["End Date"] >= start_date))]
-            budget_df = filtered_df[(filtered_df["Type"] == "budget") & ((filtered_df["Start Date"] <= end_date) & (filtered_df["End Date"] >= start_date))]
-
-        # Calculate net position based on filtered budgets and costs
-        net_value = budget_df["Amount"].sum() - cost_df["Amount"].sum()
-
-        # Determine net position color
-        if net_value < 0:
-            net_color = "red"
-        elif net_value > 0.8 * budget_df["Amount"].sum():
-            net_color = "green"
-        else:
-            net_color = "blue"
-
-        # Create subplots with shared x-axis
-        # Fixed bar height and dynamic figure height calculation
-        fixed_bar_height = 100  # Set a fixed height for each bar
-        num_items = len(cost_df) + len(budget_df) + 1  # +1 for Net Position bar
-        fig_height = max(400, num_items * fixed_bar_height)
-
-        fig = make_subplots(
-            rows=3,
-            cols=1,
-            shared_xaxes=True,
-            subplot_titles=("Cost Items", "Budget Items", "Net Position"),
-            vertical_spacing=0.1  # Adjust spacing between subplots
+            end_date = project_dates[1] if project_dates and project_dates[1] else "2026-12-31"
+
+        filters = dict(
+            project_ids=project_ids,
+            start_date=start_date,
+            end_date=end_date,
+            categories=categories,
+            types=labels
         )
-        # Filter by labels if provided
-        if labels:
-            df = df[df["Type"].isin(labels)]
 
-        # Add cost items as horizontal bars with category-based coloring
-        for _, row in cost_df.iterrows():
-            color = CATEGORY_COLORS.get(row["Category"], "#333333")
-            fig.add_trace(go.Bar(
-                x=[row["Amount"]],
-                y=[row["Item Name"]],
-                orientation='h',
-                name=row["Category"],
-                marker_color=color,
-                showlegend=False,
-                legendgroup=row["Category"],
-                text=f"{row['Start Date'].strftime('%Y-%m-%d')} - {row['End Date'].strftime('%Y-%m-%d')}",
-                textposition='inside'
-            ), row=1, col=1)
-
-        # Add budget items as horizontal bars with category-based coloring
-        for _, row in budget_df.iterrows():
-            color = CATEGORY_COLORS.get(row["Category"], "#333333")
-            fig.add_trace(go.Bar(
-                x=[row["Amount"]],
-                y=[row["Item Name"]],
-                orientation='h',
-                name=row["Category"],
-                marker_color=color,
-                showlegend=False,
-                legendgroup=row["Category"],
-                text=f"{row['Start Date'].strftime('%Y-%m-%d')} - {row['End Date'].strftime('%Y-%m-%d')}",
-                textposition='inside'
-            ), row=2, col=1)
+        grouped = "group" in group_by_category
+        grouped_source = current_app.config.get('OVERVIEW_GROUPED_SOURCE')
+
+        def build_figure():
+            if view_mode == "burn":
+                # Cumulative cost against budget, prorated by day over the window
+                df = load_burn_frame(**filters)
+                return build_burn_figure(monthly_burn(df, start_date, end_date))
+
+            if grouped:
+                # Grouped totals are aggregated from the matching items chunk
+                # by chunk, or read from the monthly rollup plus the items of
+                # the months at the edges of the window
+                if grouped_source == 'items':
+                    cost_df, budget_df = stream_grouped_frames(**filters)
+                else:
+                    cost_df, budget_df = load_rollup_frames(**filters)
+                if cost_df.empty and budget_df.empty:
+                    return go.Figure()
+            else:
+                # Query only items matching the selected projects, categories, labels and dates
+                df = load_items_frame(**filters)
+                if df.empty:
+                    return go.Figure()
+                cost_df, budget_df = split_by_type(df, False)
+
+            # The net position covers all items, only the bars are capped
+            net_value, net_color = net_position(cost_df, budget_df)
+            cost_df = cap_bars(cost_df, max_bars, offsets["cost"], "cost")
+            budget_df = cap_bars(budget_df, max_bars, offsets["budget"], "budget")
+            return build_timeline_figure(cost_df, budget_df, net_value, net_color)
+
+        def serialized_figure():
+            return cached('overview', key, lambda: build_figure().to_json(), tags=tags)
+
+        # The data version of the selected projects keeps results from before a write apart
+        key = flight_key(
+            project_ids, str(start_date), str(end_date), categories or [], labels or [],
+            view_mode, grouped, grouped_source, max_bars, offsets["cost"], offsets["budget"],
+            get_projects_version(read_session(), project_ids)
+        )
+        tags = [ALL_PROJECTS_TAG] if project_ids is None else [project_tag(project_id) for project_id in project_ids]
 
-        # Add net position as a horizontal bar
-        fig.add_trace(go.Bar(
-            x=[net_value],
-            y=["Net Position"],
-            orientation='h',
-            name="Net Position",
-            marker_color=net_color,
-            showlegend=False
-        ), row=3, col=1)
+        # Identical concurrent requests share one computation
+        fig = json.loads(serialized_figure() if flight is None else flight.do(key, serialized_figure))
 
-        # Update layout to ensure shared x-axis and correct ordering of subplots
-        fig.update_layout(
-            height=fig_height,  # Set dynamic figure height based on the number of items
-            barmode="stack",
-            xaxis_title="Amount",
-            yaxis_title="Items",
-            title="Project Costs, Budgets, and Net Position",
-            bargap=0.2,
-            font=dict(size=12),
-            yaxis1=dict(
-                tickmode='array',
-                tickvals=list(range(len(cost_df))),
-                automargin=True,
-                dtick=1
-            ),
-            yaxis2=dict(
-                tickmode='array',
-                tickvals=list(range(len(budget_df))),
-                automargin=True,
-                dtick=1
-            ),
-            yaxis3=dict(
-                tickmode='array',
-                tickvals=[0],
-                automargin=True,
-                dtick=1
-            )
-        )
+        # When the bars keep their structure, e.g. after a date change in the
+        # grouped view, only the changed data is sent instead of the whole figure
+        signature = figure_signature(fig)
+        if signature == displayed_signature:
+            fig = patch_figure(fig)
 
-        # Only return project start and end dates if start_date or end_date is not provided
-        if not start_date or not end_date:
-            return fig, project_start_date, project_end_date
+        # Only return the default dates if start_date or end_date was not provided
+        if dates_defaulted:
+            return fig, start_date, end_date, offsets, signature
 
         # Otherwise, keep the manually selected date range
-        return fig, no_update, no_update
+        return fig, no_update, no_update, offsets, signature
 
     return dash_app
@@ -1,27 +1,20 @@
-from dash import Dash, html, dcc, Input, Output, no_update, State
+import json
+import os
+
+from dash import ClientsideFunction, Dash, html, dcc, Input, Output, no_update, State
 from flask_sqlalchemy import SQLAlchemy
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
 from urllib.parse import urlparse, parse_qs
-from ..db import db
-from ..models import Items, Projects
+from ..query_budget import max_queries
+from ..replica import read_session
+from ..models import Projects
+from ..cache import cached, project_tag
+from ..changes import get_project_version
+from .data import load_project_store
+from .figures import CATEGORY_COLORS, NET_COLORS, figure_template
 
+ASSETS_FOLDER = os.path.join(os.path.dirname(__file__), 'assets')
+DATA_VERSION_POLL_SECONDS = 30
 
-# Map category names to hex color codes
-CATEGORY_COLORS = {
-    "consultancy services": "#1f77b4",
-    "licenses": "#ff7f0e",
-    "operations": "#2ca02c",
-    "business travels": "#d62728",
-    "internal FTE": "#9467bd",
-    "other": "#8c564b"
-}
-NET_COLORS = {
-    "Net Position Negative": "red",
-    "Net Position within 80-100% of budget": "green",
-    "Net Position <80% of budget": "blue"
-}
 
 def init_project_dash(server):
     # Preload default project dates
@@ -32,7 +25,8 @@ def init_project_dash(server):
     dash_app = Dash(
         server=server,
         name="Project Dashboard",
-        url_base_pathname="/dash/project/"
+        url_base_pathname="/dash/project/",
+        assets_folder=ASSETS_FOLDER
     )
 
     # Layout for the dashboard
@@ -65,6 +59,16 @@ def init_project_dash(server):
             options=[{"label": "Group by Category", "value": "group"}],
             value=[]
         ),
+        dcc.RadioItems(
+            id="view-mode",
+            options=[
+                {"label": "Timeline", "value": "timeline"},
+                {"label": "Monthly burn", "value": "burn"},
+            ],
+            value="timeline",
+            inline=True,
+            style={"margin-bottom": "20px"}
+        ),
         html.Div(
             [
                 html.Div(
@@ -90,21 +94,28 @@ def init_project_dash(server):
             ],
             style={"margin-bottom": "20px", "display": "flex", "flex-wrap": "wrap"}
         ),
-        dcc.Graph(id="timeline-graph")
+        dcc.Graph(id="timeline-graph"),
+        # Columnar item data of the project and the static figure layout for the clientside callback
+        dcc.Store(id="items-store"),
+        dcc.Store(id="figure-template", data=figure_template()),
+        # Checks the project's data version, the items are only resent when it changed
+        dcc.Interval(id="data-version-poll", interval=DATA_VERSION_POLL_SECONDS * 1000)
     ])
 
-    # Callback to update the graph
+    # Load the project's items into the browser when the page opens, and again
+    # only when the project's data version has changed since the last load
     @dash_app.callback(
-        [Output("timeline-graph", "figure"),
+        [Output("items-store", "data"),
          Output("date-picker-range", "start_date"),
          Output("date-picker-range", "end_date")],
         [Input("url", "href"),
-         Input("date-picker-range", "start_date"),
-         Input("date-picker-range", "end_date"),
-         Input("category-dropdown", "value"),
-         Input("group-by-category", "value")]
+         Input("data-version-poll", "n_intervals")],
+        [State("items-store", "data"),
+         State("date-picker-range", "start_date"),
+         State("date-picker-range", "end_date")]
     )
-    def update_dashboard(href, start_date, end_date, categories, group_by_category):
+    @max_queries(3)
+    def load_project_data(href, n_intervals, store, start_date, end_date):
         # Parse project ID from query string
         project_id = None
         if href:
@@ -114,166 +125,42 @@ def init_project_dash(server):
                 project_id = int(query_params['project_id'][0])
 
         if not project_id:
-            return go.Figure(), None, None
-
-        # Query only items related to the specific project
-        items = db.session.query(Items, Projects.project_name).join(Projects).filter(Projects.project_id == project_id).all()
-
-        if not items:
-            return go.Figure(), None, None
-
-        # Convert items to a DataFrame
-        df = pd.DataFrame([{
-            "Project": project_name,
-            "Item Name": item.item_name,
-            "Type": item.type,
-            "Amount": item.amount,
-            "Category": item.category,
-            "Start Date": item.item_start_date,
-            "End Date": item.item_end_date
-        } for item, project_name in items])
-
-        project = db.session.query(Projects.proj_start_date, Projects.proj_end_date).filter(
-            Projects.project_id == project_id).first()
-        project_start_date = project.proj_start_date
-        project_end_date = project.proj_end_date
-
-        if not start_date:
-            start_date = project_start_date
-        else:
-            start_date = pd.to_datetime(start_date)
-
-        if not end_date:
-            end_date = project_end_date
-        else:
-            end_date = pd.to_datetime(end_date)
-
-        # Apply category filter if categories are selected
-        if categories:
-            filtered_df = df[df["Category"].isin(categories)]
-        else:
-            filtered_df = df
-
-        # Group by category if the group-by-category option is selected
-        if "group" in group_by_category:
-            cost_df = filtered_df[filtered_df["Type"] == "cost"].groupby("Category").agg({
-                "Amount": "sum",
-                "Start Date": "min",
-                "End Date": "max"
-            }).reset_index()
+            return None, None, None
 
-            budget_df = filtered_df[filtered_df["Type"] == "budget"].groupby("Category").agg({
-                "Amount": "sum",
-                "Start Date": "min",
-                "End Date": "max"
-            }).reset_index()
+        session = read_session()
+        version = get_project_version(session, project_id)
+        if version is None:
+            return None, None, None
 
-            # Modify item names for grouped data
-            cost_df["Item Name"] = cost_df["Category"] + " (Cost)"
-            budget_df["Item Name"] = budget_df["Category"] + " (Budget)"
-        else:
-            cost_df = filtered_df[(filtered_df["Type"] == "cost") & ((filtered_df["Start Date"] <= end_date) & (filtered_df["End Date"] >= start_date))]
-            budget_df = filtered_df[(filtered_df["Type"] == "budget") & ((filtered_df["Start Date"] <= end_date) & (filtered_df["End Date"] >= start_date))]
+        if store and store["project_id"] == project_id and store["version"] == version:
+            return no_update, no_update, no_update
 
-        # Calculate net position based on filtered budgets and costs
-        net_value = budget_df["Amount"].sum() - cost_df["Amount"].sum()
-
-        # Determine net position color
-        if net_value < 0:
-            net_color = "red"
-        elif net_value > 0.8 * budget_df["Amount"].sum():
-            net_color = "green"
-        else:
-            net_color = "blue"
-
-        # Create subplots with shared x-axis
-        # Fixed bar height and dynamic figure height calculation
-        fixed_bar_height = 100  # Set a fixed height for each bar
-        num_items = len(cost_df) + len(budget_df) + 1  # +1 for Net Position bar
-        fig_height = max(400, num_items * fixed_bar_height)
-
-        fig = make_subplots(
-            rows=3,
-            cols=1,
-            shared_xaxes=True,
-            subplot_titles=("Cost Items", "Budget Items", "Net Position"),
-            vertical_spacing=0.1  # Adjust spacing between subplots
-        )
-
-        # Add cost items as horizontal bars with category-based coloring
-        for _, row in cost_df.iterrows():
-            color = CATEGORY_COLORS.get(row["Category"], "#333333")
-            fig.add_trace(go.Bar(
-                x=[row["Amount"]],
-                y=[row["Item Name"]],
-                orientation='h',
-                name=row["Category"],
-                marker_color=color,
-                showlegend=False,
-                legendgroup=row["Category"],
-                text=f"{row['Start Date'].strftime('%Y-%m-%d')} - {row['End Date'].strftime('%Y-%m-%d')}",
-                textposition='inside'
-            ), row=1, col=1)
-
-        # Add budget items as horizontal bars with category-based coloring
-        for _, row in budget_df.iterrows():
-            color = CATEGORY_COLORS.get(row["Category"], "#333333")
-            fig.add_trace(go.Bar(
-                x=[row["Amount"]],
-                y=[row["Item Name"]],
-                orientation='h',
-                name=row["Category"],
-                marker_color=color,
-                showlegend=False,
-                legendgroup=row["Category"],
-                text=f"{row['Start Date'].strftime('%Y-%m-%d')} - {row['End Date'].strftime('%Y-%m-%d')}",
-                textposition='inside'
-            ), row=2, col=1)
-
-        # Add net position as a horizontal bar
-        fig.add_trace(go.Bar(
-            x=[net_value],
-            y=["Net Position"],
-            orientation='h',
-            name="Net Position",
-            marker_color=net_color,
-            showlegend=False
-        ), row=3, col=1)
-
-        # Update layout to ensure shared x-axis and correct ordering of subplots
-        fig.update_layout(
-            height=fig_height,  # Set dynamic figure height based on the number of items
-            barmode="stack",
-            xaxis_title="Amount",
-            yaxis_title="Items",
-            title="Project Costs, Budgets, and Net Position",
-            bargap=0.2,
-            font=dict(size=12),
-            yaxis1=dict(
-                tickmode='array',
-                tickvals=list(range(len(cost_df))),
-                automargin=True,
-                dtick=1
-            ),
-            yaxis2=dict(
-                tickmode='array',
-                tickvals=list(range(len(budget_df))),
-                automargin=True,
-                dtick=1
-            ),
-            yaxis3=dict(
-                tickmode='array',
-                tickvals=[0],
-                automargin=True,
-                dtick=1
-            )
-        )
+        data = json.loads(cached(
+            'project_store', f"{project_id}:{version}",
+            lambda: json.dumps(load_project_store(project_id, version)),
+            tags=[project_tag(project_id)]
+        ))
 
         # Only return project start and end dates if start_date or end_date is not provided
         if not start_date or not end_date:
-            return fig, project_start_date, project_end_date
+            project = session.query(Projects.proj_start_date, Projects.proj_end_date).filter(
+                Projects.project_id == project_id).first()
+            return data, project.proj_start_date, project.proj_end_date
 
         # Otherwise, keep the manually selected date range
-        return fig, no_update, no_update
+        return data, no_update, no_update
+
+    # Filtering, grouping and the figure itself are computed in the browser
+    dash_app.clientside_callback(
+        ClientsideFunction(namespace="projectDash", function_name="buildTimeline"),
+        Output("timeline-graph", "figure"),
+        [Input("items-store", "data"),
+         Input("date-picker-range", "start_date"),
+         Input("date-picker-range", "end_date"),
+         Input("category-dropdown", "value"),
+         Input("group-by-category", "value"),
+         Input("view-mode", "value")],
+        [State("figure-template", "data")]
+    )
 
     return dash_app
@@ -0,0 +1,171 @@
+import csv
+import io
+from datetime import datetime
+
+from sqlalchemy import select
+
+from .models import Items, Projects
+from .replica import read_session
+
+# Items joined with their project, streamed in chunks from a server-side
+# cursor as CSV, Parquet or Arrow IPC. Parquet and Arrow need the optional
+# pyarrow package; CSV only uses the standard library.
+EXPORT_COLUMNS = {
+    "item_id": Items.item_id,
+    "item_name": Items.item_name,
+    "type": Items.type,
+    "amount": Items.amount,
+    "category": Items.category,
+    "item_tag": Items.item_tag,
+    "item_start_date": Items.item_start_date,
+    "item_end_date": Items.item_end_date,
+    "project_id": Projects.project_id,
+    "project_name": Projects.project_name,
+    "project_status": Projects.status,
+    "project_tag": Projects.tag,
+    "project_start_date": Projects.proj_start_date,
+    "project_end_date": Projects.proj_end_date,
+}
+DATE_FIELDS = ("item_start_date", "item_end_date", "project_start_date", "project_end_date")
+INTEGER_FIELDS = ("item_id", "amount", "project_id")
+
+# Rows per fetch from the cursor, and per Parquet row group or Arrow batch
+EXPORT_CHUNK_SIZE = 20_000
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+
+def export_query(project_ids=None, start_date=None, end_date=None, categories=None):
+    # Same filters as the dashboards: items overlapping the window, in item_id order
+    query = select(*EXPORT_COLUMNS.values()).join(Projects, Items.project_id == Projects.project_id)
+    if project_ids:
+        query = query.where(Items.project_id.in_(project_ids))
+    if categories:
+        query = query.where(Items.category.in_(categories))
+    if end_date is not None:
+        query = query.where(Items.item_start_date <= end_date)
+    if start_date is not None:
+        query = query.where(Items.item_end_date >= start_date)
+    return query.order_by(Items.item_id).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+
+
+def parse_export_args(args):
+    # ?projectIds=1,2&startDate=2025-01-01&endDate=2025-12-31&categories=licenses&format=csv,
+    # lists may also be given as repeated arguments; raises ValueError on bad input
+    def listed(name):
+        return [value for argument in args.getlist(name) for value in argument.split(',') if value]
+
+    def date(name):
+        value = args.get(name)
+        return datetime.strptime(value, '%Y-%m-%d') if value else None
+
+    export_format = args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+
+    filters = dict(
+        project_ids=[int(project_id) for project_id in listed('projectIds')] or None,
+        start_date=date('startDate'),
+        end_date=date('endDate'),
+        categories=listed('categories') or None,
+    )
+    return export_format, filters
+
+
+def csv_chunks(partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    dates = [index for index, name in enumerate(EXPORT_COLUMNS) if name in DATE_FIELDS]
+    for rows in partitions:
+        for row in rows:
+            row = list(row)
+            for index in dates:
+                if row[index] is not None:
+                    row[index] = row[index].strftime('%Y-%m-%d')
+            writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # An export without rows still has its header
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class ChunkSink:
+    # Write-only file object for pyarrow that hands out what was written since the last take()
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def arrow_schema(pa):
+    types = {name: pa.int64() if name in INTEGER_FIELDS else pa.timestamp('us') if name in DATE_FIELDS
+             else pa.string() for name in EXPORT_COLUMNS}
+    return pa.schema(list(types.items()))
+
+
+def arrow_chunks(partitions, export_format):
+    import pyarrow as pa
+
+    schema = arrow_schema(pa)
+    sink = ChunkSink()
+    if export_format == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema, compression='snappy')
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    # Each chunk of rows becomes one Parquet row group or Arrow record batch
+    for rows in partitions:
+        columns = list(zip(*rows))
+        batch = pa.record_batch([pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                                schema=schema)
+        writer.write_batch(batch)
+        yield sink.take()
+    writer.close()
+    yield sink.take()
+
+
+def export_chunks(export_format, filters):
+    # Response body chunks. The query runs once streaming starts: the view's
+    # session is closed when it returns, and a server-side cursor only lives
+    # as long as its session. Core rows skip the ORM's per-row processing.
+    partitions = read_session().connection().execute(export_query(**filters)).partitions()
+    if export_format == 'csv':
+        yield from csv_chunks(partitions)
+    else:
+        yield from arrow_chunks(partitions, export_format)
+
+
+def pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
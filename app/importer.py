@@ -0,0 +1,194 @@
+import os
+import time
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select
+from sqlalchemy.exc import DataError, IntegrityError
+
+from .db import db
+from .changes import mark_projects_changed
+from .ingest import INT32_MAX, INT32_MIN, ITEM_COLUMNS, ITEM_TYPES, TEXT_LENGTHS, insert_frame
+from .models import Projects
+
+# Bulk import of items from CSV or Parquet files, for initial portfolio loads.
+# The file is read in chunks; each chunk is validated column-wise with pandas,
+# loaded through app.ingest.insert_frame (COPY on Postgres, executemany
+# elsewhere, with one rollup upsert per chunk) and committed, and rejected
+# rows are written to a reject file. A chunk the database still refuses is
+# rolled back and all its rows are rejected with the database error.
+# Columns match /api/export: item_name, type, amount, category, item_tag,
+# item_start_date, item_end_date and project_name or project_id.
+IMPORT_CHUNK_SIZE = 50_000
+REQUIRED_COLUMNS = ('item_name', 'type', 'amount', 'category', 'item_start_date', 'item_end_date')
+PROJECT_NAME_LENGTH = Projects.__table__.c.project_name.type.length
+# Lookup value of a project_name shared by several projects
+AMBIGUOUS_PROJECT = -1
+
+
+def read_chunks(path, chunk_size):
+    # DataFrames of at most chunk_size rows; CSV values are read as strings
+    import pandas as pd
+
+    if path.lower().endswith(('.parquet', '.pq')):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_size)
+
+
+def project_lookup(session, by_name):
+    # One query for the whole import: project names (or ids) to project ids.
+    # Rows naming a project whose name is not unique are rejected, as their
+    # items could otherwise go to the wrong project; they need project_id.
+    if by_name:
+        lookup = {}
+        for name, project_id in session.execute(select(Projects.project_name, Projects.project_id)):
+            lookup[name] = AMBIGUOUS_PROJECT if name in lookup else project_id
+        return lookup
+    return {project_id: project_id for project_id in session.execute(select(Projects.project_id)).scalars()}
+
+
+def create_missing_projects(session, df, lookup):
+    # Projects named in the chunk but not in the database, spanning their items
+    import pandas as pd
+
+    names = df['project_name'].fillna('').astype(str)
+    missing = names[~names.isin(lookup.keys()) & (names != '') & (names.str.len() <= PROJECT_NAME_LENGTH)]
+    if missing.empty:
+        return []
+
+    starts = pd.to_datetime(df['item_start_date'], format='%Y-%m-%d', errors='coerce')
+    ends = pd.to_datetime(df['item_end_date'], format='%Y-%m-%d', errors='coerce')
+    spans = pd.DataFrame({'name': names, 'start': starts, 'end': ends})[names.isin(missing)]
+    spans = spans.groupby('name').agg(start=('start', 'min'), end=('end', 'max'))
+    projects = [
+        Projects(project_name=name, status='active', tag='',
+                 proj_start_date=None if pd.isna(start) else start.to_pydatetime(),
+                 proj_end_date=None if pd.isna(end) else end.to_pydatetime())
+        for name, start, end in spans.itertuples()
+    ]
+    session.add_all(projects)
+    session.flush()
+    lookup.update({project.project_name: project.project_id for project in projects})
+    return list(spans.index)
+
+
+def validate_chunk(df, lookup, by_name):
+    # Column-wise checks; returns the rows to insert and the rejected rows with an error column
+    import numpy as np
+    import pandas as pd
+
+    text = {column: df[column].fillna('').astype(str).str.strip() if column in df else pd.Series('', index=df.index)
+            for column in ('item_name', 'type', 'category', 'item_tag')}
+    amount = pd.to_numeric(df['amount'], errors='coerce')
+    start = pd.to_datetime(df['item_start_date'], format='%Y-%m-%d', errors='coerce')
+    end = pd.to_datetime(df['item_end_date'], format='%Y-%m-%d', errors='coerce')
+    if by_name:
+        project_name = df['project_name'].fillna('').astype(str)
+        project_id = project_name.map(lookup)
+    else:
+        project_id = pd.to_numeric(df['project_id'], errors='coerce').map(lookup)
+
+    # The first failing check of a row is its error
+    checks = [
+        (text['item_name'] == '', "Missing item_name"),
+        (text['category'] == '', "Missing category"),
+        (~text['type'].isin(ITEM_TYPES), f"type must be one of {', '.join(ITEM_TYPES)}"),
+        *[(text[field].str.len() > length, f"{field} is longer than {length} characters")
+          for field, length in TEXT_LENGTHS.items() if field != 'type'],
+        (amount.isna() | (amount != amount.round()), "amount must be an integer"),
+        ((amount < INT32_MIN) | (amount > INT32_MAX), f"amount must be between {INT32_MIN} and {INT32_MAX}"),
+        (start.isna(), "item_start_date must be a YYYY-MM-DD date"),
+        (end.isna(), "item_end_date must be a YYYY-MM-DD date"),
+        (end < start, "item_end_date is before item_start_date"),
+        (project_name.str.len() > PROJECT_NAME_LENGTH if by_name else pd.Series(False, index=df.index),
+         f"project_name is longer than {PROJECT_NAME_LENGTH} characters"),
+        (project_id == AMBIGUOUS_PROJECT, "project_name matches several projects, use project_id instead"),
+        (project_id.isna(), "Project not found"),
+    ]
+    errors = pd.Series(np.select([check for check, _ in checks], [message for _, message in checks], ''),
+                       index=df.index)
+    valid = errors == ''
+
+    # Inserted rows keep the index of their source rows for the reject file
+    rows = pd.DataFrame({
+        'item_name': text['item_name'][valid].to_numpy(),
+        'type': text['type'][valid].to_numpy(),
+        'project_id': project_id[valid].to_numpy('int64'),
+        'amount': amount[valid].to_numpy('int64'),
+        'category': text['category'][valid].to_numpy(),
+        'item_tag': text['item_tag'][valid].to_numpy(),
+        'item_start_date': np.asarray(start[valid].dt.to_pydatetime()),
+        'item_end_date': np.asarray(end[valid].dt.to_pydatetime()),
+    }, columns=list(ITEM_COLUMNS), index=df.index[valid])
+    rejects = df[~valid].assign(error=errors[~valid])
+    return rows, rejects
+
+
+def import_items(path, rejects_path, chunk_size=IMPORT_CHUNK_SIZE, create_projects=False, log=print):
+    # Returns (inserted, rejected). Each chunk is committed on its own, so an
+    # interrupted import keeps the chunks loaded before it.
+    import pandas as pd
+
+    session = db.session
+    inserted = rejected = 0
+    lookup = by_name = None
+    if os.path.exists(rejects_path):
+        os.remove(rejects_path)
+
+    for number, df in enumerate(read_chunks(path, chunk_size), start=1):
+        if lookup is None:
+            missing = [column for column in REQUIRED_COLUMNS if column not in df]
+            by_name = 'project_name' in df
+            if missing or not (by_name or 'project_id' in df):
+                raise click.UsageError(f"{path} lacks the columns {', '.join(missing or ['project_name or project_id'])}")
+            lookup = project_lookup(session, by_name)
+
+        created = create_missing_projects(session, df, lookup) if create_projects and by_name else []
+        rows, rejects = validate_chunk(df, lookup, by_name)
+        try:
+            if not rows.empty:
+                mark_projects_changed(session, set(rows['project_id'].unique().tolist()))
+                insert_frame(session.connection(), rows)
+            session.commit()
+        except (DataError, IntegrityError) as e:
+            # A value the checks above let through; the chunk's projects are rolled back too
+            session.rollback()
+            for name in created:
+                lookup.pop(name, None)
+            error = f"Chunk rejected by the database: {str(e.orig).splitlines()[0]}"
+            rejects = pd.concat([rejects, df.loc[rows.index].assign(error=error)]).sort_index()
+            rows, created = rows.iloc[:0], []
+        except Exception:
+            session.rollback()
+            raise
+
+        if not rejects.empty:
+            rejects.to_csv(rejects_path, mode='a', header=rejected == 0, index=False)
+        inserted += len(rows)
+        rejected += len(rejects)
+        log(f"Chunk {number}: {len(rows)} items inserted, {len(rejects)} rejected"
+            + (f", {len(created)} projects created" if created else ""))
+
+    return inserted, rejected
+
+
+@click.command('import-items')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--rejects', 'rejects_path', type=click.Path(dir_okay=False),
+              help="CSV file for rejected rows, default PATH.rejects.csv")
+@click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True, help="Rows per chunk and transaction")
+@click.option('--create-projects', is_flag=True, help="Create projects whose project_name does not exist yet")
+@with_appcontext
+def import_items_command(path, rejects_path, chunk_size, create_projects):
+    """Import items from a CSV or Parquet file."""
+    rejects_path = rejects_path or f"{path}.rejects.csv"
+    started = time.perf_counter()
+    inserted, rejected = import_items(path, rejects_path, chunk_size, create_projects, log=click.echo)
+    elapsed = time.perf_counter() - started
+
+    click.echo(f"Imported {inserted} items in {elapsed:.1f}s ({inserted / elapsed:.0f} rows/s)")
+    if rejected:
+        click.echo(f"{rejected} rows rejected, see {rejects_path}")
@@ -0,0 +1,207 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import DBAPIError
+
+from .models import Items, Projects
+from .rollup import add_to_rollup, merge_rollup, merge_staged_rollup
+
+ITEM_TYPES = ('cost', 'budget')
+ITEM_COLUMNS = ('item_name', 'type', 'project_id', 'amount', 'category', 'item_tag', 'item_start_date', 'item_end_date')
+
+# Column constraints checked up front, so bad input is a 400 or a rejected
+# row instead of a database error for the whole batch
+TEXT_LENGTHS = {field: Items.__table__.c[field].type.length for field in ('item_name', 'type', 'category', 'item_tag')}
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+
+
+def read_bulk_records(request):
+    # Accept either a JSON array or one JSON object per line (NDJSON).
+    # NDJSON lines that fail to parse are returned as per-row errors.
+    if request.mimetype in ('application/x-ndjson', 'application/ndjson'):
+        records = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                records.append(ValueError(f"Invalid JSON: {e}"))
+        return records
+
+    records = request.get_json(silent=True)
+    if isinstance(records, dict):
+        records = records.get('items')
+    if not isinstance(records, list):
+        raise ValueError("Expected a JSON array of items or an NDJSON body")
+    return records
+
+
+def parse_integer(value, field):
+    # Integral numbers or digit strings within the int32 columns; no booleans or fractions
+    if isinstance(value, bool):
+        raise ValueError(f"{field} must be an integer")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{field} must be an integer")
+        value = int(value)
+    elif not isinstance(value, int):
+        try:
+            value = int(str(value).strip())
+        except ValueError:
+            raise ValueError(f"{field} must be an integer") from None
+    if not INT32_MIN <= value <= INT32_MAX:
+        raise ValueError(f"{field} must be between {INT32_MIN} and {INT32_MAX}")
+    return value
+
+
+def parse_text(value, field):
+    value = str(value)
+    if len(value) > TEXT_LENGTHS[field]:
+        raise ValueError(f"{field} is longer than {TEXT_LENGTHS[field]} characters")
+    return value
+
+
+def parse_item(data):
+    # Same fields as create_item; item_tag is optional for bulk loads
+    if not isinstance(data, dict):
+        raise ValueError("Item must be a JSON object")
+
+    missing = [field for field in ('item_name', 'type', 'project_id', 'amount', 'category', 'startDate', 'endDate')
+               if data.get(field) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+    if data['type'] not in ITEM_TYPES:
+        raise ValueError(f"type must be one of {', '.join(ITEM_TYPES)}")
+
+    start_date = datetime.strptime(data['startDate'], '%Y-%m-%d')
+    end_date = datetime.strptime(data['endDate'], '%Y-%m-%d')
+    if end_date < start_date:
+        raise ValueError("endDate is before startDate")
+
+    return {
+        'item_name': parse_text(data['item_name'], 'item_name'),
+        'type': data['type'],
+        'project_id': parse_integer(data['project_id'], 'project_id'),
+        'amount': parse_integer(data['amount'], 'amount'),
+        'category': parse_text(data['category'], 'category'),
+        'item_tag': parse_text(data.get('item_tag') or '', 'item_tag'),
+        'item_start_date': start_date,
+        'item_end_date': end_date,
+    }
+
+
+def validate_items(session, records):
+    # Validate every record up front and collect errors by row index
+    rows, errors = [], []
+    for index, data in enumerate(records):
+        try:
+            if isinstance(data, Exception):
+                raise data
+            rows.append((index, parse_item(data)))
+        except (KeyError, TypeError, ValueError) as e:
+            errors.append({"index": index, "error": str(e)})
+
+    # One lookup for all referenced projects
+    project_ids = {row['project_id'] for _, row in rows}
+    known = set(session.execute(
+        select(Projects.project_id).where(Projects.project_id.in_(project_ids))
+    ).scalars()) if project_ids else set()
+
+    valid = []
+    for index, row in rows:
+        if row['project_id'] in known:
+            valid.append(row)
+        else:
+            errors.append({"index": index, "error": f"Project {row['project_id']} not found"})
+
+    errors.sort(key=lambda error: error["index"])
+    return valid, errors
+
+
+def copy_items(connection, rows):
+    # COPY the rows through the DBAPI cursor of the current transaction
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for row in rows:
+        writer.writerow([row[column] for column in ITEM_COLUMNS])
+    copy_csv(connection, buffer)
+
+
+def copy_csv(connection, buffer, table='items'):
+    # COPY CSV rows in ITEM_COLUMNS order from a text buffer. Errors are
+    # wrapped like those of executed statements, e.g. as DataError.
+    statement = f"COPY {table} ({', '.join(ITEM_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(statement, buffer)
+    except connection.dialect.dbapi.Error as e:
+        raise DBAPIError.instance(statement, None, e, connection.dialect.dbapi.Error) from e
+    finally:
+        cursor.close()
+
+
+def insert_items(connection, rows):
+    # COPY on Postgres, a single executemany everywhere else
+    if not rows:
+        return 0
+
+    if connection.dialect.name == 'postgresql':
+        copy_items(connection, rows)
+    else:
+        connection.execute(insert(Items.__table__), rows)
+
+    # Core inserts bypass the ORM flush listener, so update the rollup here
+    add_to_rollup(connection, rows)
+
+    return len(rows)
+
+
+def rollup_buckets(df):
+    # Bucket deltas of a frame of item rows, grouped by project, category, type and month
+    import pandas as pd
+
+    start = pd.to_datetime(df['item_start_date'])
+    frame = df.assign(month=start.dt.to_period('M').dt.to_timestamp(), item_start_date=start,
+                      item_end_date=pd.to_datetime(df['item_end_date']))
+    buckets = frame.groupby(['project_id', 'category', 'type', 'month'], as_index=False).agg(
+        amount=('amount', 'sum'), item_count=('amount', 'size'),
+        min_start_date=('item_start_date', 'min'), max_end_date=('item_end_date', 'max'))
+    return [
+        dict(project_id=int(project_id), category=category, type=item_type, month=month.to_pydatetime(),
+             amount=int(amount), item_count=int(count), min_start_date=min_start.to_pydatetime(),
+             max_end_date=max_end.to_pydatetime())
+        for project_id, category, item_type, month, amount, count, min_start, max_end
+        in buckets.itertuples(index=False)
+    ]
+
+
+def insert_frame(connection, df):
+    # insert_items for a validated DataFrame with the ITEM_COLUMNS, as from
+    # the importer. Postgres COPYs the frame into a staging table and moves it
+    # to items and the rollup with two set-based statements; on SQLite the
+    # rollup takes upserts of deltas grouped with pandas.
+    if df.empty:
+        return 0
+
+    if connection.dialect.name == 'postgresql':
+        columns = ', '.join(ITEM_COLUMNS)
+        connection.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS items_import AS "
+            f"SELECT {columns} FROM items WITH NO DATA"))
+        buffer = io.StringIO()
+        df.to_csv(buffer, columns=list(ITEM_COLUMNS), header=False, index=False, quoting=csv.QUOTE_NONNUMERIC)
+        copy_csv(connection, buffer, 'items_import')
+        connection.execute(text(f"INSERT INTO items ({columns}) SELECT {columns} FROM items_import"))
+        merge_staged_rollup(connection, 'items_import')
+        connection.execute(text("TRUNCATE items_import"))
+    else:
+        connection.execute(insert(Items.__table__), df.to_dict('records'))
+        merge_rollup(connection, rollup_buckets(df))
+
+    return len(df)
@@ -0,0 +1,188 @@
+import threading
+import time
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .cache import cache_status
+from .pool_metrics import pool_status
+
+# Per-endpoint request metrics in the Prometheus text format. Dash callback
+# requests are labelled with the callback ID instead of the shared
+# _dash-update-component route. Nothing is registered unless METRICS_ENABLED
+# is set, so requests and queries carry no overhead when scraping is off.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_PREFIX = 'projectplanner_'
+METRICS_ENDPOINT = 'main.metrics'
+
+_listening = False
+
+
+class EndpointStats:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.response_bytes = 0
+        self.statuses = {}
+
+
+class MetricsRegistry:
+    # Process-wide totals shared by the Flask app and the Dash server
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, endpoint, status, seconds, queries, sql_seconds, response_bytes):
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats()
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[index] += 1
+            stats.count += 1
+            stats.seconds += seconds
+            stats.queries += queries
+            stats.sql_seconds += sql_seconds
+            stats.response_bytes += response_bytes
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: (list(stats.buckets), stats.count, stats.seconds, stats.queries, stats.sql_seconds,
+                               stats.response_bytes, dict(stats.statuses))
+                    for endpoint, stats in self.endpoints.items()}
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetrics:
+    # Counters of the current request, kept on flask.g
+    __slots__ = ('started', 'queries', 'sql_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+
+def request_label():
+    # Dash routes every callback through one URL, the callback ID tells them apart
+    if request.path.endswith('/_dash-update-component'):
+        body = request.get_json(silent=True)
+        if isinstance(body, dict) and body.get('output'):
+            return f"dash:{body['output']}"
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_started', []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('metrics_query_started')
+    if not started:
+        return
+    started = started.pop()
+    metrics = g.get('metrics') if has_app_context() else None
+    if metrics is not None:
+        metrics.queries += 1
+        metrics.sql_seconds += time.perf_counter() - started
+
+
+def start_request():
+    g.metrics = RequestMetrics()
+
+
+def finish_request(response):
+    metrics = g.pop('metrics', None)
+    if metrics is not None and request.endpoint != METRICS_ENDPOINT:
+        registry.record(
+            request_label(), response.status_code, time.perf_counter() - metrics.started,
+            metrics.queries, metrics.sql_seconds, response.content_length or 0
+        )
+    return response
+
+
+def init_metrics(app):
+    # Called for the Flask app and the Dash server; the SQL listeners cover all engines
+    global _listening
+    if not app.config.get('METRICS_ENABLED'):
+        return
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', after_cursor_execute)
+        _listening = True
+    app.before_request(start_request)
+    app.after_request(finish_request)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def labels(**values):
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in values.items()) + '}'
+
+
+def metric(lines, name, kind, help_text, samples):
+    # samples are (suffix, label string, value) tuples of one metric family
+    lines.append(f'# HELP {METRIC_PREFIX}{name} {help_text}')
+    lines.append(f'# TYPE {METRIC_PREFIX}{name} {kind}')
+    for suffix, label_string, value in samples:
+        lines.append(f'{METRIC_PREFIX}{name}{suffix}{label_string} {value}')
+
+
+def render_metrics(engines):
+    # engines maps a bind name to the engine whose pool is reported
+    snapshot = sorted(registry.snapshot().items())
+    lines = []
+
+    latency = []
+    for endpoint, (buckets, count, seconds, *_) in snapshot:
+        for bound, observed in zip(LATENCY_BUCKETS, buckets):
+            latency.append(('_bucket', labels(endpoint=endpoint, le=bound), observed))
+        latency.append(('_bucket', labels(endpoint=endpoint, le='+Inf'), count))
+        latency.append(('_sum', labels(endpoint=endpoint), round(seconds, 6)))
+        latency.append(('_count', labels(endpoint=endpoint), count))
+    metric(lines, 'request_duration_seconds', 'histogram',
+           'Request latency by endpoint or Dash callback ID', latency)
+    metric(lines, 'requests_total', 'counter', 'Requests by endpoint and status code', [
+        ('', labels(endpoint=endpoint, status=status), requests)
+        for endpoint, (*_, statuses) in snapshot for status, requests in sorted(statuses.items())
+    ])
+    metric(lines, 'sql_queries_total', 'counter', 'SQL statements executed while serving the endpoint', [
+        ('', labels(endpoint=endpoint), stats[3]) for endpoint, stats in snapshot
+    ])
+    metric(lines, 'sql_seconds_total', 'counter', 'Time spent executing SQL statements for the endpoint', [
+        ('', labels(endpoint=endpoint), round(stats[4], 6)) for endpoint, stats in snapshot
+    ])
+    metric(lines, 'response_bytes_total', 'counter', 'Response body bytes, streamed responses count as 0', [
+        ('', labels(endpoint=endpoint), stats[5]) for endpoint, stats in snapshot
+    ])
+
+    cache = cache_status()
+    metric(lines, 'cache_requests_total', 'counter', 'Response cache lookups by namespace and result', [
+        ('', labels(namespace=namespace, result=result), value)
+        for namespace, counters in sorted(cache.get('namespaces', {}).items())
+        for result, value in sorted(counters.items())
+    ])
+
+    pools = [(bind, pool_status(engine)) for bind, engine in engines.items()]
+    for key, kind, help_text in (
+        ('checked_out', 'gauge', 'Connections currently checked out of the pool'),
+        ('checkouts', 'counter', 'Connection checkouts from the pool'),
+        ('timeouts', 'counter', 'Checkouts that timed out waiting for a connection'),
+        ('wait_seconds_total', 'counter', 'Time spent waiting for a pooled connection'),
+    ):
+        name = 'pool_' + (key if key.endswith('_total') or kind == 'gauge' else key + '_total')
+        metric(lines, name, kind, help_text, [
+            ('', labels(bind=bind), status[key]) for bind, status in pools if key in status
+        ])
+
+    return '\n'.join(lines) + '\n'
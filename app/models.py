@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Boolean
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String, Boolean
 from sqlalchemy.orm import validates
 
 from .db import db
@@ -6,6 +6,10 @@ from .db import db
 
 class Views(db.Model):
     __tablename__ = 'views'
+    __table_args__ = (
+        # get_user_projects: views of a user joined to their projects
+        Index('ix_views_user_id_project_id', 'user_id', 'project_id'),
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(String(50))
     project_id = Column(Integer, ForeignKey('projects.project_id', ondelete="CASCADE"))
@@ -26,12 +30,18 @@ class Projects(db.Model):
     tag = Column(String(50))
     proj_start_date= Column(DateTime)
     proj_end_date = Column(DateTime)
+    # Bumped by app.changes on every write to the project, its items or views
+    data_version = Column(Integer, nullable=False, default=1, server_default='1')
 
     def __str__(self):
         return f"{self.user_name}: {self.review_date:%x}"
 
 class Items(db.Model):
     __tablename__ = 'items'
+    __table_args__ = (
+        # get_project_items and the dashboards: items of a project filtered by type, category and dates
+        Index('ix_items_project_type_category_dates', 'project_id', 'type', 'category', 'item_start_date', 'item_end_date'),
+    )
     item_id = Column(Integer, primary_key=True)
     item_name = Column(String(100))
     type = Column(String(50))
@@ -44,3 +54,16 @@ class Items(db.Model):
 
     def __str__(self):
         return f"{self.user_name}: {self.review_date:%x}"
+
+class ItemRollup(db.Model):
+    # Per-month totals of items, keyed by the month of item_start_date and
+    # kept in sync with items by app.rollup in the same transaction
+    __tablename__ = 'item_rollup'
+    project_id = Column(Integer, ForeignKey('projects.project_id', ondelete="CASCADE"), primary_key=True)
+    category = Column(String(50), primary_key=True)
+    type = Column(String(50), primary_key=True)
+    month = Column(DateTime, primary_key=True)
+    amount = Column(BigInteger)
+    item_count = Column(Integer)
+    min_start_date = Column(DateTime)
+    max_end_date = Column(DateTime)
@@ -0,0 +1,119 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, select, text
+
+from .cache import cached, project_tag
+from .changes import get_project_version
+from .models import Items
+from .rollup import month_start, next_month
+
+# Prorate each item's amount over the days it covers, one row per month
+MONTHLY_NET_POSITION_SQL = text("""
+    WITH spans AS (
+        SELECT type, amount, item_start_date::date AS start_day, item_end_date::date AS end_day
+        FROM items
+        WHERE project_id = :project_id
+          AND item_start_date IS NOT NULL AND item_end_date IS NOT NULL
+          AND item_end_date >= item_start_date
+    ),
+    shares AS (
+        SELECT spans.type, month,
+               spans.amount::numeric
+                 * (LEAST(spans.end_day, (month + interval '1 month - 1 day')::date)
+                    - GREATEST(spans.start_day, month::date) + 1)
+                 / (spans.end_day - spans.start_day + 1) AS share
+        FROM spans,
+             generate_series(date_trunc('month', spans.start_day), date_trunc('month', spans.end_day),
+                             interval '1 month') AS month
+    )
+    SELECT to_char(month, 'YYYY-MM') AS month,
+           SUM(CASE WHEN type = 'budget' THEN share ELSE 0 END) AS budget,
+           SUM(CASE WHEN type = 'cost' THEN share ELSE 0 END) AS cost
+    FROM shares
+    GROUP BY month
+    ORDER BY month
+""")
+
+
+def project_totals(session, project_id):
+    budget, cost = session.execute(
+        select(
+            func.coalesce(func.sum(case((Items.type == 'budget', Items.amount), else_=0)), 0),
+            func.coalesce(func.sum(case((Items.type == 'cost', Items.amount), else_=0)), 0),
+        ).where(Items.project_id == project_id)
+    ).one()
+    return int(budget), int(cost)
+
+
+def as_day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def prorate_months(rows):
+    # Same proration as MONTHLY_NET_POSITION_SQL, for databases without generate_series
+    months = {}
+    for item_type, amount, start, end in rows:
+        if item_type not in ('budget', 'cost') or start is None or end is None or end < start:
+            continue
+        start_day, end_day = as_day(start), as_day(end)
+        total_days = (end_day - start_day).days + 1
+
+        month = month_start(start_day).date()
+        while month <= end_day:
+            following = next_month(month).date()
+            overlap = (min(end_day, following - timedelta(days=1)) - max(start_day, month)).days + 1
+            totals = months.setdefault(month.strftime('%Y-%m'), {'budget': 0.0, 'cost': 0.0})
+            totals[item_type] += (amount or 0) * overlap / total_days
+            month = following
+
+    return [(month, totals['budget'], totals['cost']) for month, totals in sorted(months.items())]
+
+
+def monthly_net_position(session, project_id):
+    if session.get_bind().dialect.name == 'postgresql':
+        rows = session.execute(MONTHLY_NET_POSITION_SQL, {"project_id": project_id}).all()
+    else:
+        rows = prorate_months(session.execute(
+            select(Items.type, Items.amount, Items.item_start_date, Items.item_end_date)
+            .where(Items.project_id == project_id)
+        ))
+
+    return [
+        {
+            "month": month,
+            "budget": round(float(budget), 2),
+            "cost": round(float(cost), 2),
+            "net_position": round(float(budget) - float(cost), 2),
+        }
+        for month, budget, cost in rows
+    ]
+
+
+def compute_net_position(session, project_id, split_monthly):
+    budget, cost = project_totals(session, project_id)
+    result = {
+        "project_id": project_id,
+        "budget": budget,
+        "cost": cost,
+        "net_position": budget - cost,
+    }
+    if split_monthly:
+        result["months"] = monthly_net_position(session, project_id)
+    return result
+
+
+def get_net_position(session, project_id, split_monthly=False):
+    # Serialized result, None when the project does not exist. Keyed by the
+    # project's data version, so a write in any worker process makes older
+    # entries unreachable, and tagged with the project for eager invalidation.
+    version = get_project_version(session, project_id)
+    if version is None:
+        return None
+
+    return cached(
+        'net_position', f'{project_id}:{version}:{split_monthly}',
+        lambda: json.dumps(compute_net_position(session, project_id, split_monthly)),
+        tags=[project_tag(project_id)]
+    )
+
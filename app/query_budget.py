@@ -0,0 +1,86 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds on the SQL statements an endpoint or Dash callback may run, so
+# an N+1 loop over items or views shows up as soon as it is introduced.
+# QUERY_BUDGET_MODE decides what happens when a budget is exceeded: 'raise'
+# fails the request (for tests and checks), 'warn' prints a warning and
+# 'off' skips counting altogether. Outside an app context budgets raise.
+BUDGET_MODES = ('off', 'warn', 'raise')
+
+_active = ContextVar('query_budgets', default=())
+_listener_lock = threading.Lock()
+_listening = False
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class Budget:
+    def __init__(self, name, limit):
+        self.name = name
+        self.limit = limit
+        self.statements = []
+
+    def report(self):
+        statement, repeats = Counter(self.statements).most_common(1)[0]
+        return (f"{self.name} ran {len(self.statements)} SQL statements, its budget is {self.limit}. "
+                f"Most repeated ({repeats}x): {' '.join(statement.split())[:200]}")
+
+
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    # Every enclosing budget counts the statement
+    for budget in _active.get():
+        budget.statements.append(statement)
+
+
+def budget_mode():
+    if not has_app_context():
+        return 'raise'
+    return current_app.config.get('QUERY_BUDGET_MODE', 'off')
+
+
+@contextmanager
+def query_budget(limit, name='block'):
+    mode = budget_mode()
+    if mode == 'off':
+        yield None
+        return
+
+    global _listening
+    if not _listening:
+        with _listener_lock:
+            if not _listening:
+                event.listen(Engine, 'before_cursor_execute', count_statement)
+                _listening = True
+
+    budget = Budget(name, limit)
+    token = _active.set(_active.get() + (budget,))
+    try:
+        yield budget
+    finally:
+        _active.reset(token)
+
+    if len(budget.statements) > limit:
+        if mode == 'raise':
+            raise QueryBudgetExceeded(budget.report())
+        print(f"Query budget exceeded: {budget.report()}")
+
+
+def max_queries(limit):
+    # Decorator form of query_budget for view functions and Dash callbacks
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with query_budget(limit, function.__name__):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
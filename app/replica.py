@@ -0,0 +1,50 @@
+from flask import g, has_request_context, request
+from sqlalchemy.orm import Session
+
+from .changes import on_projects_changed
+from .db import db
+
+REPLICA_BIND = 'replica'
+# Set after a write so the same client reads its own writes from the primary
+PRIMARY_READS_COOKIE = 'read_primary'
+
+
+def read_session():
+    # Session for read-only queries: the replica when one is configured and
+    # this client has not written recently, the primary session otherwise
+    engine = db.engines.get(REPLICA_BIND)
+    if engine is None or (has_request_context() and request.cookies.get(PRIMARY_READS_COOKIE)):
+        return db.session
+
+    if 'read_session' not in g:
+        g.read_session = Session(bind=engine)
+    return g.read_session
+
+
+@on_projects_changed
+def remember_write(project_ids):
+    if has_request_context():
+        g.wrote_data = True
+
+
+def init_read_replica(app):
+    replica_uri = app.config.get('REPLICA_DATABASE_URI')
+    if replica_uri:
+        app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}), REPLICA_BIND: replica_uri}
+
+    @app.teardown_appcontext
+    def close_read_session(exception):
+        session = g.pop('read_session', None)
+        if session is not None:
+            session.close()
+
+    @app.after_request
+    def pin_reads_to_primary(response):
+        if replica_uri and g.get('wrote_data'):
+            response.set_cookie(
+                PRIMARY_READS_COOKIE, '1',
+                max_age=app.config.get('REPLICA_STICKY_SECONDS', 10),
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
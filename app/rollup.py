@@ -0,0 +1,224 @@
+from datetime import datetime
+
+from sqlalchemy import and_, delete, event, func, inspect, literal_column, select, text
+from sqlalchemy.orm import Session
+
+from .models import ItemRollup, Items
+
+ROLLUP_KEY_ATTRS = ('project_id', 'category', 'type', 'item_start_date')
+
+# Advisory lock namespace of the per-project rollup locks, see lock_rollup
+ROLLUP_LOCK_NAMESPACE = 7601
+# Buckets per multi-row upsert statement on Postgres
+ROLLUP_BATCH_SIZE = 1000
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def next_month(month):
+    if month.month == 12:
+        return datetime(month.year + 1, 1, 1)
+    return datetime(month.year, month.month + 1, 1)
+
+
+def rollup_key(project_id, category, item_type, start_date):
+    # Items without a project, category, type or start date never show up in the rollup
+    if project_id is None or category is None or item_type is None or start_date is None:
+        return None
+    return (project_id, category, item_type, month_start(start_date))
+
+
+def item_rollup_keys(item):
+    # Current bucket of the item plus, for updates, the bucket it was moved out of
+    state = inspect(item)
+    current = [getattr(item, attr) for attr in ROLLUP_KEY_ATTRS]
+    keys = {rollup_key(*current)}
+
+    previous = list(current)
+    changed = False
+    for index, attr in enumerate(ROLLUP_KEY_ATTRS):
+        history = state.attrs[attr].history
+        if history.deleted:
+            previous[index] = history.deleted[0]
+            changed = True
+    if changed:
+        keys.add(rollup_key(*previous))
+
+    keys.discard(None)
+    return keys
+
+
+def lock_rollup(connection, project_ids):
+    # Postgres: serialize rollup writes per project until the transaction
+    # ends, so a bucket recomputed from items also sees the items of writers
+    # that committed while this one waited. SQLite serializes writers anyway.
+    if connection.dialect.name != 'postgresql' or not project_ids:
+        return
+
+    # The locks are held until the transaction ends, so projects already
+    # locked in it, e.g. by mark_projects_changed, are skipped
+    transaction = connection.get_transaction()
+    held = connection.info.get('rollup_locks')
+    if held is None or held[0] is not transaction:
+        held = connection.info['rollup_locks'] = (transaction, set())
+    project_ids = {int(project_id) for project_id in project_ids} - held[1]
+    if not project_ids:
+        return
+
+    connection.execute(text(
+        "SELECT COUNT(pg_advisory_xact_lock(:namespace, project_id)) "
+        "FROM (SELECT unnest(CAST(:project_ids AS integer[])) AS project_id ORDER BY 1) AS locked"
+    ), {"namespace": ROLLUP_LOCK_NAMESPACE, "project_ids": sorted(project_ids)})
+    held[1].update(project_ids)
+
+
+def rollup_upsert(connection, rows, relative):
+    # INSERT ... ON CONFLICT DO UPDATE of rollup rows. Relative upserts add
+    # the rows as deltas to an existing bucket, the others replace it.
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as upsert
+        least, greatest = func.least, func.greatest
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as upsert
+        least, greatest = func.min, func.max
+    else:
+        raise NotImplementedError(f"The item rollup does not support {dialect}")
+
+    rollup = ItemRollup.__table__
+    statement = upsert(rollup)
+    new = statement.excluded
+    if relative:
+        values = dict(
+            amount=func.coalesce(rollup.c.amount, literal_column('0')) + new.amount,
+            item_count=func.coalesce(rollup.c.item_count, literal_column('0')) + new.item_count,
+            min_start_date=least(func.coalesce(rollup.c.min_start_date, new.min_start_date), new.min_start_date),
+            max_end_date=greatest(func.coalesce(rollup.c.max_end_date, new.max_end_date),
+                                  func.coalesce(new.max_end_date, rollup.c.max_end_date)),
+        )
+    else:
+        values = {column: new[column] for column in ('amount', 'item_count', 'min_start_date', 'max_end_date')}
+    statement = statement.on_conflict_do_update(
+        index_elements=[rollup.c.project_id, rollup.c.category, rollup.c.type, rollup.c.month],
+        set_=values,
+    )
+
+    if dialect == 'sqlite':
+        connection.execute(statement, rows)
+        return
+    # SQLAlchemy runs an ON CONFLICT executemany row by row on Postgres, so
+    # send multi-row VALUES of up to ROLLUP_BATCH_SIZE rows instead
+    for start in range(0, len(rows), ROLLUP_BATCH_SIZE):
+        connection.execute(statement.values(rows[start:start + ROLLUP_BATCH_SIZE]))
+
+
+def refresh_rollup(connection, keys):
+    # Recompute each touched bucket from items; a bucket only spans one
+    # project, category, type and month so this stays cheap per write
+    items = Items.__table__
+    rollup = ItemRollup.__table__
+    lock_rollup(connection, {key[0] for key in keys})
+
+    for project_id, category, item_type, month in keys:
+        bucket = and_(
+            items.c.project_id == project_id,
+            items.c.category == category,
+            items.c.type == item_type,
+            items.c.item_start_date >= month,
+            items.c.item_start_date < next_month(month),
+        )
+        totals = connection.execute(
+            select(
+                func.sum(items.c.amount),
+                func.count(),
+                func.min(items.c.item_start_date),
+                func.max(items.c.item_end_date),
+            ).where(bucket)
+        ).one()
+
+        if totals[1]:
+            rollup_upsert(connection, [dict(
+                project_id=project_id,
+                category=category,
+                type=item_type,
+                month=month,
+                amount=totals[0] or 0,
+                item_count=totals[1],
+                min_start_date=totals[2],
+                max_end_date=totals[3],
+            )], relative=False)
+        else:
+            connection.execute(delete(rollup).where(and_(
+                rollup.c.project_id == project_id,
+                rollup.c.category == category,
+                rollup.c.type == item_type,
+                rollup.c.month == month,
+            )))
+
+
+def add_to_rollup(connection, rows):
+    # Inserts only ever add to a bucket, so bulk loads merge per-bucket deltas
+    # into the rollup with relative upserts instead of recomputing
+    deltas = {}
+    for row in rows:
+        key = rollup_key(row['project_id'], row['category'], row['type'], row['item_start_date'])
+        if key is None:
+            continue
+        delta = deltas.setdefault(key, [0, 0, row['item_start_date'], row['item_end_date']])
+        delta[0] += row['amount'] or 0
+        delta[1] += 1
+        delta[2] = min(delta[2], row['item_start_date'])
+        if row['item_end_date'] is not None:
+            delta[3] = max(delta[3], row['item_end_date']) if delta[3] is not None else row['item_end_date']
+
+    merge_rollup(connection, [
+        dict(zip(('project_id', 'category', 'type', 'month'), key),
+             amount=amount, item_count=count, min_start_date=min_start, max_end_date=max_end)
+        for key, (amount, count, min_start, max_end) in deltas.items()
+    ])
+
+
+def merge_rollup(connection, buckets):
+    # Add pre-aggregated bucket deltas (dicts with the rollup's columns) with
+    # relative upserts, so concurrent writers never overwrite each other
+    if not buckets:
+        return
+
+    lock_rollup(connection, {bucket['project_id'] for bucket in buckets})
+    rollup_upsert(connection, buckets, relative=True)
+
+
+def merge_staged_rollup(connection, table):
+    # Postgres: add the items staged in table to the rollup with one grouped
+    # upsert, bucketing by month as the item_rollup migration's backfill does
+    connection.execute(text(
+        "SELECT COUNT(pg_advisory_xact_lock(:namespace, project_id)) "
+        f"FROM (SELECT DISTINCT project_id FROM {table} WHERE project_id IS NOT NULL ORDER BY 1) AS locked"
+    ), {"namespace": ROLLUP_LOCK_NAMESPACE})
+    connection.execute(text(f"""
+        INSERT INTO item_rollup (project_id, category, type, month, amount, item_count, min_start_date, max_end_date)
+        SELECT project_id, category, type, date_trunc('month', item_start_date),
+               SUM(amount), COUNT(*), MIN(item_start_date), MAX(item_end_date)
+        FROM {table}
+        WHERE project_id IS NOT NULL AND category IS NOT NULL AND type IS NOT NULL AND item_start_date IS NOT NULL
+        GROUP BY project_id, category, type, date_trunc('month', item_start_date)
+        ON CONFLICT (project_id, category, type, month) DO UPDATE SET
+            amount = COALESCE(item_rollup.amount, 0) + excluded.amount,
+            item_count = COALESCE(item_rollup.item_count, 0) + excluded.item_count,
+            min_start_date = LEAST(item_rollup.min_start_date, excluded.min_start_date),
+            max_end_date = GREATEST(item_rollup.max_end_date, excluded.max_end_date)
+    """))
+
+
+@event.listens_for(Session, 'after_flush')
+def refresh_rollup_after_flush(session, flush_context):
+    # Runs inside the flush, so the rollup is written in the same transaction as the items
+    keys = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Items):
+            keys |= item_rollup_keys(obj)
+
+    if keys:
+        refresh_rollup(session.connection(), keys)
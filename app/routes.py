@@ -1,7 +1,19 @@
-from flask import Blueprint, render_template, request, jsonify
+import hashlib
+import json
 
-from .dashboards import project_dash
+from flask import Blueprint, Response, current_app, render_template, request, jsonify, stream_with_context
+from sqlalchemy import select
+
+from .cache import cache_status, cached, invalidate_user, project_tag, user_tag
+from .changes import get_project_version, get_projects_version, mark_projects_changed
+from .ingest import INT32_MAX, insert_items, read_bulk_records, validate_items
 from .models import Projects, Views, Items
+from .export import EXPORT_FORMATS, export_chunks, parse_export_args, pyarrow_available
+from .metrics import render_metrics
+from .net_position import get_net_position
+from .pool_metrics import pool_status
+from .query_budget import max_queries
+from .replica import read_session
 from datetime import datetime
 from .db import db
 
@@ -10,11 +22,13 @@ main = Blueprint('main', __name__)
 
 @main.route('/', methods=['GET'])
 @main.route('/overview')
+@max_queries(0)
 def overview():
     print('Request for index page received')
     return render_template('index.html', title="Overview")
 
 @main.route('/project/<int:project_id>')
+@max_queries(1)
 def project_detail(project_id):
     project = Projects.query.get_or_404(project_id)
 
@@ -30,27 +44,61 @@ def project_detail(project_id):
     )
 
 
+def data_etag(*parts):
+    # Strong ETag over the data (or data versions) and arguments that shape a response
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def with_etag(response, etag):
+    # no-cache makes browsers revalidate with If-None-Match instead of refetching
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(etag):
+    return with_etag(Response(status=304), etag)
+
+
 @main.route('/api/user_projects', methods=['GET'])
+@max_queries(2)
 def get_user_projects():
     username = request.args.get('username')
     if not username:
         return jsonify({"error": "Username is required"}), 400
 
-    try:
+    def build():
         # Query projects associated with the user via the views table
-        user_projects = db.session.query(Projects).join(Views).filter(Views.user_id == username).all()
+        user_projects = read_session().query(
+            Projects.project_id, Projects.project_name
+        ).join(Views).filter(Views.user_id == username).all()
+
+        # The response only depends on the ids and names, so item writes keep the ETag valid
+        etag = data_etag(username, [tuple(project) for project in user_projects])
 
         # Serialize the project data
         projects_data = [
             {"id": project.project_id, "name": project.project_name}
             for project in user_projects
         ]
+        return json.dumps([etag, projects_data])
 
-        return jsonify({"projects": projects_data}), 200
+    try:
+        # Keyed by the versions of the user's own projects: adding or removing
+        # a view and writing one of the projects in any worker changes them,
+        # so entries of other workers' caches are not served after a change
+        user_project_ids = select(Views.project_id).where(Views.user_id == username)
+        key = data_etag(username, get_projects_version(read_session(), user_project_ids))
+        etag, projects_data = json.loads(cached('user_projects', key, build, tags=[user_tag(username)]))
+        if request.if_none_match.contains(etag):
+            return not_modified(etag)
+
+        return with_etag(jsonify({"projects": projects_data}), etag), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @main.route('/api/projects', methods=['POST'])
+@max_queries(5)
 def create_project():
     data = request.json
     username = data.get('username')  # Get the username from the request
@@ -83,6 +131,7 @@ def create_project():
         )
         db.session.add(new_view)
         db.session.commit()
+        invalidate_user(username)
 
         return jsonify({"message": "Project created successfully!", "project": data}), 201
     except Exception as e:
@@ -90,6 +139,7 @@ def create_project():
         return jsonify({"error": str(e)}), 400
 
 @main.route('/api/items', methods=['POST'])
+@max_queries(5)
 def create_item():
     data = request.json
     try:
@@ -111,8 +161,33 @@ def create_item():
         return jsonify({"error": str(e)}), 400
 
 
+# Bulk item ingestion: a JSON array or NDJSON body, validated up front and
+# inserted in one transaction. With ?skip_invalid=true valid rows are
+# inserted even when other rows fail validation.
+@main.route('/api/items/bulk', methods=['POST'])
+@max_queries(5)
+def create_items_bulk():
+    try:
+        records = read_bulk_records(request)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows, errors = validate_items(db.session, records)
+    if errors and request.args.get('skip_invalid') != 'true':
+        return jsonify({"error": "Some items are invalid, nothing was inserted", "errors": errors}), 400
+
+    try:
+        mark_projects_changed(db.session, {row['project_id'] for row in rows})
+        inserted = insert_items(db.session.connection(), rows)
+        db.session.commit()
+        return jsonify({"message": "Items created successfully!", "inserted": inserted, "errors": errors}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+
 
 @main.route('/api/items/<int:item_id>', methods=['DELETE'])
+@max_queries(6)
 def delete_item(item_id):
     item = Items.query.get(item_id)
     if not item:
@@ -127,39 +202,160 @@ def delete_item(item_id):
         return jsonify({"error": str(e)}), 500
 
 
+# Columns returned by /api/project_items, keyed by their JSON field name
+ITEM_FIELDS = {
+    "id": Items.item_id,
+    "name": Items.item_name,
+    "type": Items.type,
+    "amount": Items.amount,
+    "category": Items.category,
+    "tag": Items.item_tag,
+    "start_date": Items.item_start_date,
+    "end_date": Items.item_end_date,
+}
+MAX_ITEMS_PAGE_SIZE = 5000
+ITEMS_STREAM_CHUNK_SIZE = 1000
+
+
+def page_arg(name, minimum):
+    # Optional integer query argument between minimum and the largest item id
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if not minimum <= number <= INT32_MAX:
+        raise ValueError(f"{name} must be between {minimum} and {INT32_MAX}")
+    return number
+
+
+def serialize_item_row(row):
+    item = dict(zip(ITEM_FIELDS, row))
+    item["start_date"] = item["start_date"].strftime('%Y-%m-%d') if item["start_date"] else None
+    item["end_date"] = item["end_date"].strftime('%Y-%m-%d') if item["end_date"] else None
+    return item
+
+
 # Route to get items for a specific project
+# Optional keyset pagination with ?after_id=&limit= and NDJSON streaming with ?format=ndjson,
+# limit is capped at MAX_ITEMS_PAGE_SIZE
 @main.route('/api/project_items', methods=['GET'])
+@max_queries(2)
 def get_project_items():
     project_id = request.args.get('projectId')
     if not project_id:
         return jsonify({"error": "Project ID is required"}), 400
 
     try:
-        # Query items for the given project ID
-        items = Items.query.filter_by(project_id=project_id).all()
-
-        # Serialize the items data
-        items_data = [
-            {
-                "id": item.item_id,
-                "name": item.item_name,
-                "type": item.type,
-                "amount": item.amount,
-                "category": item.category,
-                "tag": item.item_tag,
-                "start_date": item.item_start_date.strftime('%Y-%m-%d') if item.item_start_date else None,
-                "end_date": item.item_end_date.strftime('%Y-%m-%d') if item.item_end_date else None
-            }
-            for item in items
-        ]
+        after_id = page_arg('after_id', 0)
+        limit = page_arg('limit', 1)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if limit is not None:
+        limit = min(limit, MAX_ITEMS_PAGE_SIZE)
 
-        return jsonify({"items": items_data}), 200
+    try:
+        # Answer conditional requests from the project's data version without querying items
+        version = get_project_version(read_session(), project_id)
+        etag = data_etag(project_id, version, sorted(request.args.items(multi=True)))
+        if version is not None and request.if_none_match.contains(etag):
+            return not_modified(etag)
+
+        # Select only the serialized columns, in item_id order so after_id can resume
+        query = select(*ITEM_FIELDS.values()).where(Items.project_id == project_id).order_by(Items.item_id)
+        if after_id is not None:
+            query = query.where(Items.item_id > after_id)
+        if limit is not None:
+            query = query.limit(limit)
+
+        if request.args.get('format') == 'ndjson':
+            # Stream rows from a server-side cursor so memory stays flat for large projects
+            def generate():
+                result = read_session().execute(query.execution_options(yield_per=ITEMS_STREAM_CHUNK_SIZE))
+                for row in result:
+                    yield json.dumps(serialize_item_row(row)) + "\n"
+
+            return with_etag(Response(stream_with_context(generate()), mimetype='application/x-ndjson'), etag)
+
+        def build():
+            items_data = [serialize_item_row(row) for row in read_session().execute(query)]
+
+            response = {"items": items_data}
+            if limit is not None:
+                # Cursor for the next page, None once the last page has been returned
+                response["next_after_id"] = items_data[-1]["id"] if len(items_data) == limit else None
+            return json.dumps(response)
+
+        # The ETag covers the project version and all arguments, so it doubles as the cache key
+        if version is None:
+            body = build()
+        else:
+            body = cached('project_items', etag, build, tags=[project_tag(project_id)])
+
+        return with_etag(Response(body, mimetype='application/json'), etag), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-def register_dash_apps(app):
-    init_project_dash(app)
+# Items joined with their projects as CSV, Parquet or Arrow IPC, streamed from
+# a server-side cursor, filtered by ?projectIds=&startDate=&endDate=&categories=
+@main.route('/api/export', methods=['GET'])
+@max_queries(0)
+def export_items():
+    try:
+        export_format, filters = parse_export_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if export_format != 'csv' and not pyarrow_available():
+        return jsonify({"error": f"The {export_format} format needs the pyarrow package"}), 400
+
+    # The export query runs in the response generator, outside the view's budget
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    response = Response(stream_with_context(export_chunks(export_format, filters)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=items.{extension}'
+    return response
+
+# Budget minus cost for a project, optionally prorated per month with ?splitMonthly=true
+@main.route('/api/net_position', methods=['GET'])
+@max_queries(3)
+def net_position():
+    project_id = request.args.get('projectId', type=int)
+    if not project_id:
+        return jsonify({"error": "Project ID is required"}), 400
+
+    try:
+        split_monthly = request.args.get('splitMonthly') == 'true'
+        body = get_net_position(db.session, project_id, split_monthly)
+        if body is None:
+            return jsonify({"error": "Project not found"}), 404
+        return Response(body, mimetype='application/json'), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Response cache backend and hit/miss counters of this worker process
+@main.route('/api/cache_stats', methods=['GET'])
+@max_queries(0)
+def cache_stats():
+    return jsonify(cache_status()), 200
+
+# Connection pool usage of this worker process
+@main.route('/api/pool_stats', methods=['GET'])
+@max_queries(0)
+def pool_stats():
+    return jsonify({bind or "default": pool_status(engine) for bind, engine in db.engines.items()}), 200
+
+# Request, SQL, cache and pool metrics of this worker process for Prometheus
+@main.route('/metrics', methods=['GET'])
+@max_queries(0)
+def metrics():
+    if not current_app.config.get('METRICS_ENABLED'):
+        return jsonify({"error": "Metrics are disabled, set METRICS_ENABLED"}), 404
+
+    # The Dash server shares these engines, so their pools cover the dashboards too
+    engines = {bind or "default": engine for bind, engine in db.engines.items()}
+    return Response(render_metrics(engines), mimetype='text/plain; version=0.0.4'), 200
 
 """
 #1. 
@@ -240,22 +436,4 @@ def delete_item(item_id):
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 400
-
-# 5. Compute net position
-@main.route('/api/net_position', methods=['GET'])
-def get_net_position():
-    project_id = request.args.get('projectId')
-    split_monthly = request.args.get('splitMonthly') == 'true'
-
-    items = Items.query.filter_by(project_id=project_id).all()
-    total_budget = sum(item.amount for item in items if item.type == 'budget')
-    total_cost = sum(item.amount for item in items if item.type == 'cost')
-
-    if split_monthly:
-        # Logic to calculate monthly split
-        net_position = total_budget - total_cost  # Example logic
-    else:
-        net_position = total_budget - total_cost
-
-    return jsonify({"net_position": net_position}), 200
 """
\ No newline at end of file
@@ -0,0 +1,85 @@
+import fcntl
+import os
+import tempfile
+from contextlib import contextmanager
+
+from alembic.script import ScriptDirectory
+from flask import current_app
+from flask_migrate import stamp, upgrade
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from .db import db
+
+# Arbitrary key shared by every worker that may run migrations
+MIGRATION_LOCK_ID = 720341
+MIGRATION_LOCK_FILE = os.path.join(tempfile.gettempdir(), 'projectplanner-migrations.lock')
+
+
+def head_revisions():
+    directory = current_app.extensions['migrate'].directory
+    return set(ScriptDirectory(directory).get_heads())
+
+
+def current_revisions(connection):
+    # Empty for a database that has never been migrated. The version table is
+    # read directly, one round trip instead of a catalog lookup first.
+    try:
+        return set(connection.execute(text("SELECT version_num FROM alembic_version")).scalars())
+    except (OperationalError, ProgrammingError):
+        # No alembic_version table: SQLite raises OperationalError, Postgres ProgrammingError
+        connection.rollback()
+        return set()
+
+
+def schema_is_current():
+    with db.engine.connect() as connection:
+        return current_revisions(connection) == head_revisions()
+
+
+@contextmanager
+def migration_lock(engine):
+    # Only one worker migrates at a time; the others wait and then find the
+    # schema already at head
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as connection:
+            # Waiting for another worker's migration may take longer than any statement_timeout
+            connection.execute(text("SET LOCAL statement_timeout = 0"))
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                connection.commit()
+    else:
+        with open(MIGRATION_LOCK_FILE, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def ensure_schema():
+    # Runs in the app context on every process start
+    if schema_is_current():
+        print("Database schema is at the head revision, skipping migrations.")
+        return
+
+    with migration_lock(db.engine):
+        # Another worker may have migrated while this one waited for the lock
+        if schema_is_current():
+            print("Database schema was migrated by another worker.")
+            return
+
+        with db.engine.connect() as connection:
+            empty = not inspect(connection).get_table_names()
+
+        db.create_all()
+        if empty:
+            # create_all already built the head schema, so only record the revision
+            print("Created the database schema.")
+            stamp()
+        else:
+            print("Migrating the database schema.")
+            upgrade()
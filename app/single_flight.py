@@ -0,0 +1,136 @@
+import fcntl
+import glob
+import hashlib
+import os
+import stat
+import tempfile
+import threading
+import time
+
+# How long result files of the cross-process variant are kept for waiters
+RESULT_FILE_SECONDS = 60
+# Keys share a fixed set of lock files so they do not pile up on disk
+LOCK_STRIPES = 64
+
+
+def flight_key(*parts):
+    # Stable key for normalized inputs; lists are sorted so that selection order does not matter
+    normalized = tuple(sorted(part) if isinstance(part, (list, tuple, set)) else part for part in parts)
+    return hashlib.sha1(repr(normalized).encode()).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # Concurrent calls with the same key in this process wait for the first
+    # one and share its result instead of repeating the work
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.waiters = 0
+
+    def do(self, key, function):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self.run(key, function)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def run(self, key, function):
+        return function()
+
+
+class FileSingleFlight(SingleFlight):
+    # Also coalesces across worker processes on the same host: the leader of
+    # each process takes a lock file for the key, and a process that waited
+    # for the lock reuses the result written after it started waiting.
+    # Results are strings (serialized figures) stored as text files in a
+    # directory only the app's user can access.
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        check_private_directory(directory)
+
+    def run(self, key, function):
+        started = time.time()
+        result_path = os.path.join(self.directory, key + '.result')
+
+        lock_path = os.path.join(self.directory, '{}.lock'.format(int(key[:8], 16) % LOCK_STRIPES))
+        with open(lock_path, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    if os.path.getmtime(result_path) >= started:
+                        with open(result_path, encoding='utf-8') as result_file:
+                            return result_file.read()
+                except (OSError, UnicodeDecodeError):
+                    pass
+
+                result = function()
+                self.write_result(result_path, result)
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def write_result(self, result_path, result):
+        handle, temporary_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(handle, 'w', encoding='utf-8') as result_file:
+            result_file.write(result)
+        os.replace(temporary_path, result_path)
+
+        # Results only matter to processes waiting right now
+        expired = time.time() - RESULT_FILE_SECONDS
+        for path in glob.glob(os.path.join(self.directory, '*.result')):
+            try:
+                if os.path.getmtime(path) < expired:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+def check_private_directory(directory):
+    # Other users must not be able to plant or read results
+    status = os.stat(directory)
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid():
+        raise RuntimeError(f"{directory} is not a directory owned by the app's user")
+    if status.st_mode & 0o077:
+        raise RuntimeError(f"{directory} must only be accessible by its owner (mode 0700)")
+
+
+def create_single_flight(config, instance_path):
+    # SINGLE_FLIGHT_MODE: 'process' (default), 'file' for cross-process, 'off'
+    mode = config.get('SINGLE_FLIGHT_MODE', 'process')
+    if mode == 'off':
+        return None
+    if mode == 'file':
+        return FileSingleFlight(config.get('SINGLE_FLIGHT_DIR') or os.path.join(instance_path, 'single-flight'))
+    return SingleFlight()
@@ -10,4 +10,57 @@ import os
 #     dbpass=conn_str_params['password'],
 #     dbhost=conn_str_params['host'],
 #     dbname=conn_str_params['dbname']
-# )
\ No newline at end of file
+# )
+
+# Connection pool settings, see https://docs.sqlalchemy.org/en/20/core/pooling.html
+SQLALCHEMY_ENGINE_OPTIONS = {
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+    'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+    'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    # Azure closes idle connections after a while and on failover
+    'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    'pool_pre_ping': True,
+}
+
+# Postgres statement_timeout in milliseconds, set once per connection;
+# migrations and the migration lock wait switch it off for their transaction
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'}
+
+# Optional read replica used by the dashboards and read-only API endpoints
+REPLICA_DATABASE_URI = os.environ.get('REPLICA_DATABASE_URI')
+# Seconds a client keeps reading from the primary after one of its writes
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+
+# Source of the overview's grouped totals: 'rollup' reads whole months inside
+# the date window from the monthly rollup table that every item write keeps
+# current and aggregates only the items at its edges, 'items' aggregates all
+# matching items in bounded memory
+OVERVIEW_GROUPED_SOURCE = os.environ.get('OVERVIEW_GROUPED_SOURCE', 'rollup')
+
+# Coalescing of identical concurrent overview computations: 'process' within
+# a worker, 'file' across the workers of a host (lock files in
+# SINGLE_FLIGHT_DIR, default the instance folder), or 'off'
+SINGLE_FLIGHT_MODE = os.environ.get('SINGLE_FLIGHT_MODE', 'process')
+SINGLE_FLIGHT_DIR = os.environ.get('SINGLE_FLIGHT_DIR')
+
+# Response cache for dashboard figures and read API responses. A redis://
+# CACHELOCATION is shared by all workers, otherwise each worker keeps an
+# in-process LRU that only sees invalidations from its own writes.
+CACHELOCATION = os.environ.get('CACHELOCATION')
+CACHE_TTL_SECONDS = int(os.environ.get('CACHE_TTL_SECONDS', 60))
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+CACHE_DISABLED = os.environ.get('CACHE_DISABLED', '').lower() in ('1', 'true', 'yes')
+
+# Items drawn per subplot of the overview timeline; the rest are rolled into
+# "other" bars that can be clicked to page through them
+OVERVIEW_MAX_BARS = int(os.environ.get('OVERVIEW_MAX_BARS', 25))
+
+# Per-endpoint latency, SQL and response size metrics served at /metrics in
+# the Prometheus text format; off by default so requests are not instrumented
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes')
+
+# What happens when a route or Dash callback runs more SQL statements than
+# its max_queries budget: 'raise' fails the request, 'warn' prints, 'off'
+# does not count statements at all
+QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE', 'off')
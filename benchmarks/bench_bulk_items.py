@@ -0,0 +1,62 @@
+"""Benchmark single-item and bulk item ingestion.
+
+Posts the same synthetic rows once through POST /api/items (one request and
+one transaction per row) and once through POST /api/items/bulk, and reports
+rows per second for each path. Uses DATABASE_URI when set, otherwise a
+temporary SQLite file.
+
+    python -m benchmarks.bench_bulk_items [rows]
+"""
+import sys
+import time
+
+from app import db
+from benchmarks.clients import make_app
+from benchmarks.synthetic import make_items_frame, seed_database
+
+
+def item_payloads(num_rows, project_ids):
+    df = make_items_frame(num_rows, seed=1)
+    return [
+        {
+            "item_name": name,
+            "type": item_type,
+            "project_id": int(project_ids[index % len(project_ids)]),
+            "amount": int(amount),
+            "category": category,
+            "item_tag": "",
+            "startDate": start.strftime('%Y-%m-%d'),
+            "endDate": end.strftime('%Y-%m-%d'),
+        }
+        for index, (name, item_type, amount, category, start, end) in enumerate(zip(
+            df["Item Name"], df["Type"], df["Amount"], df["Category"], df["Start Date"], df["End Date"]))
+    ]
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    app = make_app()
+    with app.app_context(), db.engine.begin() as connection:
+        project_ids = seed_database(connection, num_projects=10, items_per_project=0, num_users=1, views_per_user=1)
+
+    payloads = item_payloads(num_rows, project_ids)
+    client = app.test_client()
+
+    started = time.perf_counter()
+    for payload in payloads:
+        response = client.post("/api/items", json=payload)
+        assert response.status_code == 201, response.get_json()
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    response = client.post("/api/items/bulk", json=payloads)
+    assert response.status_code == 201, response.get_json()
+    bulk = time.perf_counter() - started
+
+    print(f"{'path':>12} {'rows':>8} {'seconds':>10} {'rows/s':>12}")
+    print(f"{'single':>12} {num_rows:>8} {single:>10.3f} {num_rows / single:>12.0f}")
+    print(f"{'bulk':>12} {num_rows:>8} {bulk:>10.3f} {num_rows / bulk:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
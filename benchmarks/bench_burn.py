@@ -0,0 +1,49 @@
+"""Benchmark the monthly burn computation.
+
+Compares the vectorized burn.monthly_burn with the per-item Python loop of
+net_position.prorate_months on synthetic frames, and times the overview's
+burn view end to end on a 50k-item portfolio. Uses DATABASE_URI when set,
+otherwise a temporary SQLite file.
+
+    python -m benchmarks.bench_burn
+"""
+import time
+
+from app import db
+from app.dashboards.burn import monthly_burn
+from app.net_position import prorate_months
+from benchmarks.clients import make_app, overview_dashboard
+from benchmarks.synthetic import make_items_frame, seed_database
+
+SIZES = [1_000, 10_000, 50_000, 200_000]
+PORTFOLIO_ITEMS = 50_000
+
+
+def timed(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+def main():
+    print(f"{'items':>8} {'per-item s':>11} {'numpy s':>9}")
+    for size in SIZES:
+        df = make_items_frame(size)
+        rows = list(zip(df["Type"], df["Amount"], df["Start Date"].dt.to_pydatetime(), df["End Date"].dt.to_pydatetime()))
+        loop = timed(lambda: prorate_months(rows))
+        vectorized = timed(lambda: monthly_burn(df))
+        print(f"{size:>8} {loop:>11.3f} {vectorized:>9.3f}")
+
+    app = make_app()
+    with app.app_context(), db.engine.begin() as connection:
+        seed_database(connection, num_projects=50, items_per_project=PORTFOLIO_ITEMS // 50, num_users=1, views_per_user=1)
+
+    client = app.test_client()
+    elapsed = timed(lambda: overview_dashboard(client, None, "2025-01-01", "2026-12-31", view="burn"))
+    print(f"overview burn view, {PORTFOLIO_ITEMS} items: {elapsed:.3f}s (first request builds the dashboards)")
+    elapsed = timed(lambda: overview_dashboard(client, None, "2025-03-01", "2025-12-31", view="burn"))
+    print(f"overview burn view, {PORTFOLIO_ITEMS} items: {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
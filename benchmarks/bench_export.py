@@ -0,0 +1,51 @@
+"""Throughput benchmark for /api/export.
+
+Seeds a skewed portfolio and streams the full export in each format through
+the Flask test client, reading the body chunk by chunk the way a download
+does. Reports rows per second, megabytes per second, the body size and the
+largest chunk, which stays bounded by the chunk size rather than the
+portfolio. Parquet and Arrow are skipped without pyarrow. Uses DATABASE_URI
+when set, otherwise a temporary SQLite file.
+
+    python -m benchmarks.bench_export [items]
+"""
+import sys
+import time
+
+from app import db
+from app.export import EXPORT_FORMATS, pyarrow_available
+from app.models import Items
+from benchmarks.clients import make_app
+from benchmarks.synthetic import seed_skewed
+
+
+def main():
+    num_items = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    app = make_app()
+    with app.app_context(), db.engine.begin() as connection:
+        seed_skewed(connection, num_projects=500, num_items=num_items, num_users=10, log=lambda message: None)
+    with app.app_context():
+        num_rows = db.session.query(Items).count()
+
+    client = app.test_client()
+    print(f"{num_rows} items")
+    print(f"{'format':>8} {'rows/s':>10} {'MB/s':>7} {'MB':>7} {'largest chunk KB':>17} {'seconds':>8}")
+    for export_format in EXPORT_FORMATS:
+        if export_format != "csv" and not pyarrow_available():
+            print(f"{export_format:>8} skipped, pyarrow is not installed")
+            continue
+        started = time.perf_counter()
+        response = client.get(f"/api/export?format={export_format}", buffered=False)
+        assert response.status_code == 200, response.status_code
+        size = largest = 0
+        for chunk in response.response:
+            size += len(chunk)
+            largest = max(largest, len(chunk))
+        response.close()
+        elapsed = time.perf_counter() - started
+        print(f"{export_format:>8} {num_rows / elapsed:>10.0f} {size / elapsed / 2**20:>7.1f} {size / 2**20:>7.1f} "
+              f"{largest / 1024:>17.0f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark overview responses for date-range changes.
+
+Steps the overview's date window month by month and sends each change
+twice: once without a displayed figure, which returns the full figure, and
+once with the signature of the figure the browser shows, which returns a
+Patch when the bars keep their structure. Reports the response bytes and the
+number of patched responses for the grouped and ungrouped views. Uses
+DATABASE_URI when set, otherwise a temporary SQLite file.
+
+    python -m benchmarks.bench_figure_patch [items]
+"""
+import sys
+
+from app import db
+from benchmarks.clients import make_app, overview_dashboard
+from benchmarks.synthetic import seed_database
+
+WINDOWS = [(f"2025-{month:02d}-01", f"2026-{month:02d}-28") for month in range(1, 13)]
+
+
+def step_dates(client, group):
+    full_bytes = patch_bytes = patched = 0
+    signature = None
+    for start_date, end_date in WINDOWS:
+        changed = ["date-picker-range.start_date", "date-picker-range.end_date"]
+        full = overview_dashboard(client, None, start_date, end_date, group=group, changed=changed)
+        response = overview_dashboard(client, None, start_date, end_date, group=group, signature=signature,
+                                      changed=changed)
+        outputs = response.get_json()["response"]
+        full_bytes += len(full.data)
+        patch_bytes += len(response.data)
+        patched += "__dash_patch_update" in outputs["timeline-graph"]["figure"]
+        signature = outputs["figure-signature"]["data"]
+    return full_bytes, patch_bytes, patched
+
+
+def main():
+    num_items = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    app = make_app()
+    with app.app_context(), db.engine.begin() as connection:
+        seed_database(connection, num_projects=20, items_per_project=num_items // 20, num_users=1, views_per_user=1)
+
+    client = app.test_client()
+    print(f"{'view':>10} {'changes':>8} {'full KB':>9} {'with patch KB':>14} {'patched':>8}")
+    for name, group in (("grouped", True), ("ungrouped", False)):
+        full_bytes, patch_bytes, patched = step_dates(client, group)
+        print(f"{name:>10} {len(WINDOWS):>8} {full_bytes / 1024:>9.1f} {patch_bytes / 1024:>14.1f} {patched:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark timeline figure construction.
+
+Compares the old one-trace-per-row loop with the column-wise figure builder
+used by both dashboards and reports build time and serialized figure size.
+
+    python -m benchmarks.bench_figures
+"""
+import time
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from app.dashboards.figures import CATEGORY_COLORS, build_timeline_figure, net_position
+from benchmarks.synthetic import make_items_frame
+
+SIZES = [100, 1_000, 10_000]
+
+
+def build_per_row_figure(cost_df, budget_df, net_value, net_color):
+    # The figure construction the dashboards used before the column-wise builder
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True,
+                        subplot_titles=("Cost Items", "Budget Items", "Net Position"),
+                        vertical_spacing=0.1)
+    for row_index, df in ((1, cost_df), (2, budget_df)):
+        for _, row in df.iterrows():
+            fig.add_trace(go.Bar(
+                x=[row["Amount"]],
+                y=[row["Item Name"]],
+                orientation='h',
+                name=row["Category"],
+                marker_color=CATEGORY_COLORS.get(row["Category"], "#333333"),
+                showlegend=False,
+                legendgroup=row["Category"],
+                text=f"{row['Start Date'].strftime('%Y-%m-%d')} - {row['End Date'].strftime('%Y-%m-%d')}",
+                textposition='inside'
+            ), row=row_index, col=1)
+    fig.add_trace(go.Bar(x=[net_value], y=["Net Position"], orientation='h',
+                         marker_color=net_color, showlegend=False), row=3, col=1)
+    return fig
+
+
+def measure(builder, cost_df, budget_df):
+    started = time.perf_counter()
+    net_value, net_color = net_position(cost_df, budget_df)
+    fig = builder(cost_df, budget_df, net_value, net_color)
+    payload = fig.to_json()
+    elapsed = time.perf_counter() - started
+    return elapsed, len(payload), len(fig.data)
+
+
+def main():
+    print(f"{'items':>8} {'builder':>10} {'seconds':>10} {'json bytes':>12} {'traces':>8}")
+    for size in SIZES:
+        df = make_items_frame(size)
+        cost_df = df[df["Type"] == "cost"]
+        budget_df = df[df["Type"] == "budget"]
+        for name, builder in (("per-row", build_per_row_figure), ("columnar", build_timeline_figure)):
+            elapsed, size_bytes, traces = measure(builder, cost_df, budget_df)
+            print(f"{size:>8} {name:>10} {elapsed:>10.3f} {size_bytes:>12} {traces:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Throughput benchmark for flask import-items.
+
+Seeds projects, writes a CSV and a Parquet file of synthetic items that
+reference them by name, with one row in a thousand made invalid, and imports
+each file through the CLI runner. Reports rows per second and the rejected
+rows. Parquet is skipped without pyarrow. Uses DATABASE_URI when set,
+otherwise a temporary SQLite file.
+
+    python -m benchmarks.bench_import [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app import db
+from app.export import pyarrow_available
+from benchmarks.clients import make_app
+from benchmarks.synthetic import make_items_frame, seed_skewed
+
+
+def import_frame(num_rows, project_names):
+    # Items in the layout of /api/export, with every thousandth row broken in turn
+    df = make_items_frame(num_rows)
+    rng = np.random.default_rng(1)
+    frame = df.assign(project_name=rng.choice(project_names, num_rows), item_tag="")
+    frame = frame.rename(columns={"Item Name": "item_name", "Type": "type", "Amount": "amount",
+                                  "Category": "category", "Start Date": "item_start_date",
+                                  "End Date": "item_end_date"}).drop(columns="Project")
+    frame["item_start_date"] = frame["item_start_date"].dt.strftime("%Y-%m-%d")
+    frame["item_end_date"] = frame["item_end_date"].dt.strftime("%Y-%m-%d")
+    broken = np.arange(0, num_rows, 1000)
+    frame.loc[broken[0::3], "type"] = "refund"
+    frame.loc[broken[1::3], "item_start_date"] = "2025-02-30"
+    frame.loc[broken[2::3], "project_name"] = "Unknown project"
+    return frame
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    app = make_app()
+    with app.app_context(), db.engine.begin() as connection:
+        project_ids = seed_skewed(connection, num_projects=1000, num_items=0, num_users=1, log=lambda message: None)
+
+    frame = import_frame(num_rows, [f"Project {project_id}" for project_id in project_ids])
+    directory = tempfile.mkdtemp()
+    files = {"csv": os.path.join(directory, "items.csv")}
+    frame.to_csv(files["csv"], index=False)
+    if pyarrow_available():
+        files["parquet"] = os.path.join(directory, "items.parquet")
+        frame.to_parquet(files["parquet"], index=False)
+
+    runner = app.test_cli_runner()
+    print(f"{'format':>8} {'rows':>9} {'rows/s':>9} {'rejected':>9} {'seconds':>8}")
+    for file_format, path in files.items():
+        started = time.perf_counter()
+        result = runner.invoke(args=["import-items", path])
+        elapsed = time.perf_counter() - started
+        assert result.exit_code == 0, result.output or repr(result.exception)
+        rejected = sum(1 for _ in open(f"{path}.rejects.csv")) - 1
+        print(f"{file_format:>8} {num_rows:>9} {num_rows / elapsed:>9.0f} {rejected:>9} {elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark loading dashboard items into a DataFrame.
+
+Compares the original path (ORM (Items, project_name) tuples turned into one
+dict per row and then into a DataFrame) with the typed columnar loader in
+app.dashboards.data. Reports load time, peak Python allocations while
+loading, and the deep memory size of the resulting frame. Uses DATABASE_URI
+when set, otherwise a temporary SQLite file.
+
+    python -m benchmarks.bench_item_frames [items]
+"""
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from app import db
+from app.dashboards.data import load_items_frame
+from app.models import Items, Projects
+from benchmarks.clients import make_app
+from benchmarks.synthetic import seed_database
+
+
+def load_orm_dict_frame(project_ids):
+    # The frame construction both dashboards used before the columnar loader
+    items = db.session.query(Items, Projects.project_name).join(Projects).filter(
+        Projects.project_id.in_(project_ids)).all()
+    return pd.DataFrame([{
+        "Project": project_name,
+        "Item Name": item.item_name,
+        "Type": item.type,
+        "Amount": item.amount,
+        "Category": item.category,
+        "Start Date": item.item_start_date,
+        "End Date": item.item_end_date,
+    } for item, project_name in items])
+
+
+def measure(loader, project_ids):
+    # Timed and traced in separate runs, tracemalloc slows allocation down
+    db.session.expunge_all()
+    started = time.perf_counter()
+    df = loader(project_ids)
+    elapsed = time.perf_counter() - started
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    loader(project_ids)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, df.memory_usage(deep=True).sum(), len(df)
+
+
+def main():
+    num_items = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_projects = 20
+    app = make_app()
+    with app.app_context():
+        with db.engine.begin() as connection:
+            project_ids = [int(project_id) for project_id in seed_database(
+                connection, num_projects=num_projects, items_per_project=num_items // num_projects,
+                num_users=1, views_per_user=1)]
+
+        loaders = (
+            ("orm-dicts", load_orm_dict_frame),
+            ("columnar", lambda ids: load_items_frame(project_ids=ids)),
+        )
+        print(f"{'loader':>10} {'rows':>8} {'seconds':>10} {'peak MB':>10} {'frame MB':>10}")
+        for name, loader in loaders:
+            elapsed, peak, frame_bytes, rows = measure(loader, project_ids)
+            print(f"{name:>10} {rows:>8} {elapsed:>10.3f} {peak / 2**20:>10.1f} {frame_bytes / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark the overhead of request metrics.
+
+Times /api/project_items and the grouped overview callback through the
+Flask test client with METRICS_ENABLED off and then on, with the response
+cache disabled so every request runs its queries. The off run comes first
+because the SQL listeners stay registered once an app has enabled metrics.
+Uses DATABASE_URI when set, otherwise a temporary SQLite file.
+
+    python -m benchmarks.bench_metrics [requests]
+"""
+import os
+import sys
+import time
+
+from app import db
+from benchmarks.clients import make_app, overview_dashboard
+from benchmarks.synthetic import seed_database
+
+
+def timed(client, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        assert client.get("/api/project_items?projectId=1").status_code == 200
+    items = (time.perf_counter() - started) / requests
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        assert overview_dashboard(client).status_code == 200
+    return items, (time.perf_counter() - started) / requests
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    os.environ["CACHE_DISABLED"] = "1"
+    seeded = False
+
+    print(f"{'metrics':>8} {'project_items ms':>17} {'overview ms':>12}")
+    for enabled in ("", "1"):
+        os.environ["METRICS_ENABLED"] = enabled
+        app = make_app()
+        if not seeded:
+            with app.app_context(), db.engine.begin() as connection:
+                seed_database(connection, num_projects=10, items_per_project=500, num_users=1, views_per_user=1)
+            seeded = True
+        client = app.test_client()
+        timed(client, 5)
+        items, overview = timed(client, requests)
+        print(f"{'on' if enabled else 'off':>8} {items * 1000:>17.2f} {overview * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark worker start-up time and memory.
+
+Each configuration runs in a fresh interpreter so imports are not shared:
+
+    api   create_app() and one JSON request; the dashboards are never loaded
+    full  the same, then the first request to each Dash app, which builds them
+
+Reports the seconds spent in imports and create_app, the seconds until the
+first response, the resident memory afterwards, and whether pandas, plotly
+and dash were imported. Uses DATABASE_URI when set, otherwise a temporary
+SQLite file.
+
+    python -m benchmarks.bench_startup [runs]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+CONFIGURATIONS = ("api", "full")
+DASHBOARD_MODULES = ("pandas", "plotly", "dash")
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+app = create_app()
+created = time.perf_counter()
+
+client = app.test_client()
+assert client.get("/api/pool_stats").status_code == 200
+if sys.argv[1] == "full":
+    for path in ("/dash/overview/", "/dash/project/"):
+        assert client.get(path).status_code == 200
+served = time.perf_counter()
+
+rss_kb = 0
+with open("/proc/self/status") as status:
+    for line in status:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+print(json.dumps({
+    "create_app": created - started,
+    "first_response": served - started,
+    "rss_mb": rss_kb / 1024,
+    "dashboard_modules": [name for name in %r if name in sys.modules],
+}))
+""" % (DASHBOARD_MODULES,)
+
+
+def run(configuration, env):
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, configuration],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    # create_app prints which config it loaded; the result is the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URI", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.db"))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    print(f"{'config':>8} {'create_app s':>13} {'first resp s':>13} {'rss MB':>8}  dashboard modules")
+    for configuration in CONFIGURATIONS:
+        results = [run(configuration, env) for _ in range(runs)]
+        best = min(results, key=lambda result: result["first_response"])
+        print(f"{configuration:>8} {best['create_app']:>13.3f} {best['first_response']:>13.3f} "
+              f"{best['rss_mb']:>8.1f}  {', '.join(best['dashboard_modules']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Check that concurrent item writes to one project do not fail.
+
+Creates a project, then has many threads mix single item creates
+(/api/items, ORM flush) with bulk inserts (/api/items/bulk, Core inserts)
+against it through the Flask test client. Both paths bump the project's data
+version and update the monthly rollup, so they must lock in the same order.
+Exits with status 1 if any request failed, e.g. with a Postgres deadlock,
+or if the rollup no longer matches the items. Meaningful on Postgres, where
+writers run concurrently; uses DATABASE_URI when set, otherwise a temporary
+SQLite file.
+
+    python -m benchmarks.check_concurrent_writes [threads] [requests per thread]
+"""
+import random
+import sys
+import threading
+from collections import Counter
+
+from sqlalchemy import select
+
+from app import db
+from app.models import ItemRollup, Items, Projects
+from app.rollup import month_start
+from benchmarks.clients import make_app
+
+BULK_SIZE = 3
+
+
+def new_item(project_id, rng):
+    day = rng.randrange(1, 28)
+    return {
+        "item_name": "Concurrent write",
+        "type": rng.choice(["cost", "budget"]),
+        "project_id": project_id,
+        "amount": rng.randrange(1, 1000),
+        "category": "operations",
+        "item_tag": "",
+        "startDate": f"2025-{rng.choice([1, 2, 3]):02d}-{day:02d}",
+        "endDate": "2025-12-31",
+    }
+
+
+def writer(app, project_id, seed, requests, failures):
+    # Alternates randomly between the ORM and the bulk write path
+    rng = random.Random(seed)
+    client = app.test_client()
+    for _ in range(requests):
+        if rng.random() < 0.5:
+            response = client.post("/api/items", json=new_item(project_id, rng))
+        else:
+            response = client.post("/api/items/bulk", json=[new_item(project_id, rng) for _ in range(BULK_SIZE)])
+        if response.status_code >= 400:
+            error = (response.get_json() or {}).get("error") or f"status {response.status_code}"
+            failures.append((response.request.path, error.splitlines()[0]))
+
+
+def rollup_mismatches(project_id):
+    # Buckets whose rollup totals differ from the items they summarize
+    expected = Counter()
+    counts = Counter()
+    for category, item_type, start, amount in db.session.execute(
+            select(Items.category, Items.type, Items.item_start_date, Items.amount)
+            .where(Items.project_id == project_id)):
+        key = (category, item_type, month_start(start))
+        expected[key] += amount
+        counts[key] += 1
+
+    actual = {}
+    for category, item_type, month, amount, item_count in db.session.execute(
+            select(ItemRollup.category, ItemRollup.type, ItemRollup.month, ItemRollup.amount, ItemRollup.item_count)
+            .where(ItemRollup.project_id == project_id)):
+        actual[(category, item_type, month)] = (amount, item_count)
+
+    keys = set(expected) | set(actual)
+    return [key for key in keys if actual.get(key) != (expected[key], counts[key])]
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    app = make_app()
+    with app.app_context():
+        project = Projects(project_name="Concurrent writes", status="active", tag="")
+        db.session.add(project)
+        db.session.commit()
+        project_id = project.project_id
+
+    failures = []
+    workers = [threading.Thread(target=writer, args=(app, project_id, seed, requests, failures))
+               for seed in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    with app.app_context():
+        mismatches = rollup_mismatches(project_id)
+
+    print(f"{threads * requests} requests from {threads} threads, {len(failures)} failed, "
+          f"{len(mismatches)} rollup buckets differ from the items")
+    for (path, error), count in Counter(failures).most_common(5):
+        print(f"  {count} x {path}: {error}")
+    if failures or mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Payload-size check for the overview timeline.
+
+Seeds growing portfolios and calls the ungrouped all-projects overview,
+once with the configured OVERVIEW_MAX_BARS and once uncapped, up to
+UNCAPPED_LIMIT items. Reports the figure JSON size, bar count and callback
+time. Exits with status 1 if a capped figure exceeds the size budget. Uses
+DATABASE_URI when set, otherwise a temporary SQLite file.
+
+    python -m benchmarks.check_overview_payload [budget KB]
+"""
+import sys
+import time
+
+from app import db
+from benchmarks.clients import make_app, overview_dashboard
+from benchmarks.synthetic import seed_database
+
+SIZES = [100, 1_000, 10_000, 100_000]
+UNCAPPED_LIMIT = 10_000
+
+
+def measure(app, max_bars):
+    # The Dash apps run on their own server with a copy of the app config
+    app.wsgi_app.get_server().config["OVERVIEW_MAX_BARS"] = max_bars
+    client = app.test_client()
+    started = time.perf_counter()
+    response = overview_dashboard(client, None, "2025-01-01", "2026-12-31", group=False)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.status_code
+    figure = response.get_json()["response"]["timeline-graph"]["figure"]
+    bars = sum(len(trace["y"]) for trace in figure["data"])
+    return len(response.data), bars, elapsed
+
+
+def main():
+    budget_kb = float(sys.argv[1]) if len(sys.argv) > 1 else 64
+    app = make_app()
+    max_bars = app.config.get("OVERVIEW_MAX_BARS", 25)
+
+    failures = 0
+    seeded = 0
+    print(f"{'items':>8} {'max bars':>9} {'bars':>6} {'json KB':>9} {'seconds':>8}")
+    for size in SIZES:
+        with app.app_context(), db.engine.begin() as connection:
+            seed_database(connection, num_projects=10, items_per_project=(size - seeded) // 10,
+                          num_users=1, views_per_user=1, seed=seeded)
+        seeded = size
+
+        runs = [max_bars] + ([10 * size] if size <= UNCAPPED_LIMIT else [])
+        for limit in runs:
+            size_bytes, bars, elapsed = measure(app, limit)
+            label = str(limit) if limit == max_bars else "none"
+            print(f"{size:>8} {label:>9} {bars:>6} {size_bytes / 1024:>9.1f} {elapsed:>8.2f}")
+            if limit == max_bars and size_bytes > budget_kb * 1024:
+                failures += 1
+
+    if failures:
+        print(f"{failures} capped figures exceed the {budget_kb:g} KB budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Check the SQL query budgets of every route and Dash callback.
+
+Seeds a small database and calls each endpoint and server-side callback
+through the Flask test client with QUERY_BUDGET_MODE=raise and the response
+cache disabled, covering their main variants. Reports the statements each
+call ran and exits with status 1 if any call exceeded its budget (see
+app.query_budget) or failed. The Parquet export is skipped without the
+optional pyarrow package. Uses DATABASE_URI when set, otherwise a
+temporary SQLite file.
+
+    python -m benchmarks.check_query_budgets
+"""
+import contextvars
+import os
+import sys
+
+from sqlalchemy import func, select
+
+from app import db
+from app.changes import get_project_version
+from app.models import Items
+from app.export import pyarrow_available
+from app.query_budget import QueryBudgetExceeded, query_budget
+from benchmarks.clients import make_app, overview_dashboard, project_dashboard, dash_update
+from benchmarks.synthetic import seed_database
+
+NEW_ITEM = {
+    "item_name": "Budget check item",
+    "type": "cost",
+    "amount": 1000,
+    "category": "operations",
+    "item_tag": "",
+    "startDate": "2025-01-01",
+    "endDate": "2025-06-30",
+}
+
+
+def uncounted(app, function):
+    # Setup reads for a call, run in a fresh context so that the budget
+    # counters of main() only see the statements of the call itself
+    def run():
+        with app.app_context():
+            return function(db.session)
+    return contextvars.Context().run(run)
+
+
+def delete_created_item(client, project_id):
+    # The script's own item, so reruns against the same database find one
+    item_id = uncounted(client.application, lambda session: session.execute(
+        select(func.max(Items.item_id)).where(Items.project_id == project_id, Items.item_name == NEW_ITEM["item_name"])
+    ).scalar())
+    return client.delete(f"/api/items/{item_id}")
+
+
+def unchanged_project_data(client, project_id):
+    # The store of the current data version, as the browser sends it back
+    # after a full load; the callback answers with no_update for every output
+    version = uncounted(client.application, lambda session: get_project_version(session, project_id))
+    response = project_dashboard(client, project_id, store={"project_id": project_id, "version": version})
+    if response.status_code < 400:
+        assert response.get_json()["response"] == {}, "expected no_update, the project data was reloaded"
+    return response
+
+
+def calls(client, project_id):
+    # Each endpoint and callback, with the variants that run different queries
+    item = dict(NEW_ITEM, project_id=project_id)
+    # Parquet needs the optional pyarrow package
+    parquet = [("GET /api/export parquet", lambda: client.get("/api/export?format=parquet"))] if pyarrow_available() else []
+    return [
+        ("GET /", lambda: client.get("/")),
+        ("GET /project/<id>", lambda: client.get(f"/project/{project_id}")),
+        ("GET /api/user_projects", lambda: client.get("/api/user_projects?username=user-0")),
+        ("GET /api/project_items", lambda: client.get(f"/api/project_items?projectId={project_id}")),
+        ("GET /api/project_items page", lambda: client.get(f"/api/project_items?projectId={project_id}&limit=10")),
+        ("GET /api/project_items ndjson", lambda: client.get(f"/api/project_items?projectId={project_id}&format=ndjson")),
+        ("GET /api/net_position", lambda: client.get(f"/api/net_position?projectId={project_id}")),
+        ("GET /api/net_position monthly", lambda: client.get(
+            f"/api/net_position?projectId={project_id}&splitMonthly=true")),
+        ("GET /api/export csv", lambda: client.get(f"/api/export?projectIds={project_id}&startDate=2025-01-01")),
+        *parquet,
+        ("GET /api/cache_stats", lambda: client.get("/api/cache_stats")),
+        ("GET /api/pool_stats", lambda: client.get("/api/pool_stats")),
+        ("POST /api/projects", lambda: client.post("/api/projects", json={
+            "name": "Budget check", "username": "user-0", "startDate": "2025-01-01"})),
+        ("POST /api/items", lambda: client.post("/api/items", json=item)),
+        ("POST /api/items/bulk", lambda: client.post("/api/items/bulk", json=[item] * 50)),
+        ("DELETE /api/items/<id>", lambda: delete_created_item(client, project_id)),
+        ("overview.update_project_dropdown", lambda: dash_update(
+            client, "/dash/overview/", ["project-dropdown.options"], [("url", "href", "http://localhost/")])),
+        ("overview.update_dashboard grouped", lambda: overview_dashboard(client)),
+        ("overview.update_dashboard items", lambda: overview_dashboard(client, group=False)),
+        ("overview.update_dashboard projects", lambda: overview_dashboard(client, [project_id], group=False)),
+        ("overview.update_dashboard burn", lambda: overview_dashboard(client, view="burn")),
+        ("project.load_project_data", lambda: project_dashboard(client, project_id, start_date=None, end_date=None)),
+        ("project.load_project_data unchanged", lambda: unchanged_project_data(client, project_id)),
+    ]
+
+
+def main():
+    os.environ["QUERY_BUDGET_MODE"] = "raise"
+    os.environ["CACHE_DISABLED"] = "1"
+    app = make_app()
+    app.testing = True
+    with app.app_context(), db.engine.begin() as connection:
+        project_ids = seed_database(connection, num_projects=5, items_per_project=200, num_users=2, views_per_user=3)
+    client = app.test_client()
+
+    failures = 0
+    print(f"{'call':<40} {'statements':>10}  result")
+    for name, call in calls(client, int(project_ids[0])):
+        # An outer budget with no real limit counts the statements of the call
+        with query_budget(sys.maxsize, name) as counter:
+            try:
+                response = call()
+                response.get_data()
+                result = "ok" if response.status_code < 400 else f"status {response.status_code}"
+            except QueryBudgetExceeded as e:
+                result = f"over budget: {e}"
+            except AssertionError as e:
+                result = str(e)
+        failures += result != "ok"
+        print(f"{name:<40} {len(counter.statements):>10}  {result}")
+
+    if failures:
+        print(f"{failures} calls failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
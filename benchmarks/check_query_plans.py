@@ -0,0 +1,109 @@
+"""Query-plan regression check for the hot API and dashboard paths.
+
+Runs against the Postgres database configured through DBHOST, DBNAME, DBUSER
+and DBPASS (the same variables the app uses). An empty database is seeded with
+synthetic data first. The SQL issued by each hot endpoint and callback is
+captured, every statement is EXPLAINed, and the script exits with status 1 if
+any plan falls back to a sequential scan on items or views, or if no
+statement was captured for a path.
+
+    python -m benchmarks.check_query_plans
+"""
+import json
+import sys
+
+from sqlalchemy import event, func, select
+
+from app import create_app, db
+from app.models import Projects
+from benchmarks.clients import overview_dashboard, project_dashboard
+from benchmarks.synthetic import seed_database
+
+CHECKED_TABLES = {"items", "views"}
+
+
+def capture_statements(engine, action):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = action()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    if response.status_code != 200:
+        raise RuntimeError(f"request failed with {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return statements
+
+
+def sequential_scans(plan):
+    # Walk the EXPLAIN (FORMAT JSON) tree and collect seq scans on checked tables
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in CHECKED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(sequential_scans(child))
+    return found
+
+
+def explain(connection, statement, parameters):
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            sys.exit("The query-plan check needs a Postgres database")
+
+        db.create_all()
+        with db.engine.begin() as connection:
+            if not connection.execute(select(func.count()).select_from(Projects)).scalar():
+                print("Seeding synthetic data...")
+                seed_database(connection, num_projects=500, items_per_project=100, num_users=1000, views_per_user=25)
+            connection.exec_driver_sql("ANALYZE")
+            project_id, user_id = connection.exec_driver_sql(
+                "SELECT project_id, user_id FROM views ORDER BY id LIMIT 1").one()
+
+        client = app.test_client()
+        scenarios = {
+            "get_user_projects": lambda: client.get(f"/api/user_projects?username={user_id}"),
+            "get_project_items": lambda: client.get(f"/api/project_items?projectId={project_id}"),
+            "project dashboard": lambda: project_dashboard(client, project_id),
+            "overview dashboard": lambda: overview_dashboard(
+                client, [project_id], "2025-03-01", "2025-09-30", labels=["cost"], group=False),
+        }
+
+        failures = 0
+        with db.engine.connect() as connection:
+            for name, action in scenarios.items():
+                statements = capture_statements(db.engine, action)
+                if not statements:
+                    # Nothing to check means the statements ran somewhere this check does not see
+                    print(f"{name:<20} {'NO STATEMENTS captured':<24}")
+                    failures += 1
+                for statement, parameters in statements:
+                    scans = sequential_scans(explain(connection, statement, parameters))
+                    status = "SEQ SCAN on " + ", ".join(scans) if scans else "ok"
+                    print(f"{name:<20} {status:<24} {' '.join(statement.split())[:100]}")
+                    failures += bool(scans)
+
+    if failures:
+        print(f"{failures} hot queries fall back to sequential scans or were not captured")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Check the Redis response cache against an in-memory Redis.
+
+Runs app.cache.RedisCache on a fakeredis client and checks reads, writes,
+expiry and invalidation by tag, including entries with several tags, and
+that Redis errors are treated as misses. Exits with status 1 if a check
+fails. Needs the redis and fakeredis packages; no Redis server is used.
+
+    python -m benchmarks.check_redis_cache
+"""
+import sys
+
+from app.cache import RedisCache, project_tag, user_tag
+
+
+def checks(cache, client):
+    # (name, passed) for each behaviour the app relies on
+    yield "miss returns None", cache.get("overview", "a") is None
+
+    cache.set("overview", "a", '{"figure": 1}', tags=[project_tag(1), project_tag(2)])
+    cache.set("overview", "b", '{"figure": 2}', tags=[project_tag(2)])
+    cache.set("user_projects", "c", '["etag", []]', tags=[user_tag("user-0")])
+    yield "hit returns the stored string", cache.get("overview", "a") == '{"figure": 1}'
+    yield "entries expire after the ttl", 0 < client.ttl("test:overview:a") <= cache.ttl
+    yield "tag sets expire after the ttl", 0 < client.ttl(f"test:tag:{project_tag(1)}") <= cache.ttl
+
+    cache.invalidate([project_tag(1)])
+    yield "invalidation drops the tagged entries", cache.get("overview", "a") is None
+    yield "invalidation keeps other entries", cache.get("overview", "b") == '{"figure": 2}'
+    yield "invalidation drops the tag set", not client.exists(f"test:tag:{project_tag(1)}")
+
+    cache.invalidate([project_tag(2), user_tag("user-0")])
+    yield "invalidation by several tags", (
+        cache.get("overview", "b") is None and cache.get("user_projects", "c") is None)
+    yield "invalidating an unknown tag is a no-op", cache.invalidate([project_tag(99)]) is None
+
+    stats = cache.stats.snapshot()
+    yield "hits and misses are counted", stats["overview"] == {"hits": 2, "misses": 3}
+
+
+def main():
+    try:
+        import fakeredis
+    except ImportError:
+        print("This check needs the redis and fakeredis packages.")
+        sys.exit(1)
+
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server)
+    cache = RedisCache(client, ttl=60, prefix="test:")
+    results = list(checks(cache, client))
+
+    # A Redis outage must not fail requests: reads miss, writes and invalidations are skipped
+    server.connected = False
+    cache.set("overview", "d", "{}", tags=[project_tag(3)])
+    cache.invalidate([project_tag(3)])
+    results.append(("errors are treated as misses", cache.get("overview", "d") is None))
+
+    failures = 0
+    for name, passed in results:
+        failures += not passed
+        print(f"{name:<45} {'ok' if passed else 'failed'}")
+    if failures:
+        print(f"{failures} checks failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
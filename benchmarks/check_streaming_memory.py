@@ -0,0 +1,96 @@
+"""Memory-ceiling check for the streamed grouped overview aggregation.
+
+Seeds a SQLite file with synthetic items in growing steps up to 1M items.
+At each size it runs app.dashboards.data.stream_grouped_frames over all
+projects and records the peak Python allocation. The script exits with
+status 1 if:
+- the totals differ from grouping the fully loaded item frame (checked at
+  the first size only),
+- the rollup totals of load_rollup_frames for a date window that cuts
+  through months differ from grouping the fully loaded items of that
+  window (checked at the first size only), or
+- the peak at any size exceeds the ceiling.
+
+    python -m benchmarks.check_streaming_memory [items] [ceiling MB]
+"""
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from app import db
+from app.dashboards.data import load_items_frame, load_rollup_frames, split_by_type, stream_grouped_frames
+from benchmarks.clients import make_app
+from benchmarks.synthetic import seed_database
+
+STEPS = (100_000, 300_000, 1_000_000)
+PROJECTS_PER_BATCH = 10
+ITEMS_PER_PROJECT = 1_000
+# Window for the rollup comparison, starting and ending mid-month
+ROLLUP_WINDOW = dict(start_date="2025-03-15", end_date="2025-10-20")
+
+
+def traced(function):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def same_totals(streamed, loaded):
+    columns = ["Category", "Amount", "Start Date", "End Date", "Item Name"]
+    for left, right in zip(streamed, loaded):
+        left = left[columns].sort_values("Category").reset_index(drop=True)
+        right = right[columns].astype({"Category": str}).sort_values("Category").reset_index(drop=True)
+        pd.testing.assert_frame_equal(left, right, check_dtype=False)
+
+
+def main():
+    max_items = int(sys.argv[1]) if len(sys.argv) > 1 else STEPS[-1]
+    ceiling_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 32
+    app = make_app()
+
+    failures = 0
+    seeded = 0
+    compared = False
+    print(f"{'items':>10} {'seconds':>10} {'peak MB':>10}")
+    with app.app_context():
+        for step in [size for size in STEPS if size < max_items] + [max_items]:
+            while seeded < step:
+                with db.engine.begin() as connection:
+                    seed_database(connection, num_projects=PROJECTS_PER_BATCH, items_per_project=ITEMS_PER_PROJECT,
+                                  num_users=1, views_per_user=1, seed=seeded)
+                seeded += PROJECTS_PER_BATCH * ITEMS_PER_PROJECT
+
+            frames, elapsed, peak = traced(stream_grouped_frames)
+            print(f"{seeded:>10} {elapsed:>10.2f} {peak / 2**20:>10.1f}")
+            if peak > ceiling_mb * 2**20:
+                failures += 1
+
+            if not compared:
+                loaded, _, loaded_peak = traced(lambda: split_by_type(load_items_frame(), True))
+                print(f"{'':>10} full load and group for comparison: {loaded_peak / 2**20:.1f} MB peak")
+                try:
+                    same_totals(frames, loaded)
+                except AssertionError as e:
+                    print(f"Streamed totals differ from the full load: {e}")
+                    failures += 1
+                try:
+                    same_totals(load_rollup_frames(**ROLLUP_WINDOW),
+                                split_by_type(load_items_frame(**ROLLUP_WINDOW), True))
+                except AssertionError as e:
+                    print(f"Rollup totals for {ROLLUP_WINDOW} differ from the full load: {e}")
+                    failures += 1
+                compared = True
+
+    if failures:
+        print(f"{failures} checks failed, memory ceiling {ceiling_mb:g} MB")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
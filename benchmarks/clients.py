@@ -0,0 +1,66 @@
+import os
+import tempfile
+
+
+def make_app(database_uri=None):
+    # App bound to DATABASE_URI (or a throwaway SQLite file) with the schema created
+    if database_uri:
+        os.environ['DATABASE_URI'] = database_uri
+    os.environ.setdefault('DATABASE_URI', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'benchmark.db'))
+
+    from app import create_app, db
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def dash_update(client, base_path, outputs, inputs, state=(), changed=None):
+    # Call a Dash callback through the Flask test client the way the browser does.
+    # outputs is a list of "component.property" strings, inputs and state lists
+    # of (component, property, value) tuples in callback order. changed lists
+    # the "component.property" inputs that triggered the call, all by default.
+    output_ids = [output.split(".", 1) for output in outputs]
+    body = {
+        "output": "..{}..".format("...".join(outputs)) if len(outputs) > 1 else outputs[0],
+        "outputs": [{"id": component, "property": prop} for component, prop in output_ids],
+        "inputs": [{"id": component, "property": prop, "value": value} for component, prop, value in inputs],
+        "changedPropIds": changed or [f"{component}.{prop}" for component, prop, _ in inputs],
+        "state": [{"id": component, "property": prop, "value": value} for component, prop, value in state],
+    }
+    if len(outputs) == 1:
+        body["outputs"] = body["outputs"][0]
+    return client.post(f"{base_path}_dash-update-component", json=body)
+
+
+TIMELINE_OUTPUTS = ["timeline-graph.figure", "date-picker-range.start_date", "date-picker-range.end_date"]
+OVERVIEW_OUTPUTS = TIMELINE_OUTPUTS + ["bar-offsets.data", "figure-signature.data"]
+
+
+def project_dashboard(client, project_id, store=None, start_date="2025-01-01", end_date="2026-12-31"):
+    # Loads the project's items into the browser store; filtering happens clientside
+    return dash_update(client, "/dash/project/", ["items-store.data"] + TIMELINE_OUTPUTS[1:], [
+        ("url", "href", f"http://localhost/dash/project/?project_id={project_id}"),
+        ("data-version-poll", "n_intervals", None),
+    ], state=[
+        ("items-store", "data", store),
+        ("date-picker-range", "start_date", start_date),
+        ("date-picker-range", "end_date", end_date),
+    ])
+
+
+def overview_dashboard(client, project_ids=None, start_date=None, end_date=None, categories=None, labels=None, group=True,
+                       view="timeline", click_data=None, offsets=None, signature=None, changed=None):
+    return dash_update(client, "/dash/overview/", OVERVIEW_OUTPUTS, [
+        ("project-dropdown", "value", project_ids),
+        ("date-picker-range", "start_date", start_date),
+        ("date-picker-range", "end_date", end_date),
+        ("category-dropdown", "value", categories),
+        ("label-dropdown", "value", labels),
+        ("group-by-category", "value", ["group"] if group else []),
+        ("view-mode", "value", view),
+        ("timeline-graph", "clickData", click_data),
+    ], state=[
+        ("bar-offsets", "data", offsets),
+        ("figure-signature", "data", signature),
+    ], changed=changed or (["timeline-graph.clickData"] if click_data else None))
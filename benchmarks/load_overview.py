@@ -0,0 +1,87 @@
+"""Load test for identical concurrent overview dashboard requests.
+
+Seeds a database, then fires the same all-projects overview callback from
+many threads at once. Runs this with each SINGLE_FLIGHT_MODE and reports
+the SQL statements executed, how many of them read items, and the wall time.
+Uses DATABASE_URI when set, otherwise a temporary SQLite file.
+
+    python -m benchmarks.load_overview [clients] [items]
+"""
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import db
+from benchmarks.clients import make_app, overview_dashboard
+from benchmarks.synthetic import seed_database
+
+MODES = ("off", "process", "file")
+
+
+class StatementCounter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.statements = 0
+        self.item_reads = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        with self.lock:
+            self.statements += 1
+            self.item_reads += "FROM items" in " ".join(statement.split())
+
+
+def run(mode, clients):
+    app = make_app()
+    app.config["SINGLE_FLIGHT_MODE"] = mode
+    app.config["SINGLE_FLIGHT_DIR"] = tempfile.mkdtemp()
+    # Build the dashboards before counting
+    assert app.test_client().get("/dash/overview/").status_code == 200
+
+    barrier = threading.Barrier(clients)
+    failures = []
+
+    def client_thread():
+        client = app.test_client()
+        barrier.wait()
+        response = overview_dashboard(client, None, "2025-01-01", "2026-12-31", group=False)
+        if response.status_code != 200:
+            failures.append(response.status_code)
+
+    counter = StatementCounter()
+    event.listen(Engine, "before_cursor_execute", counter)
+    try:
+        threads = [threading.Thread(target=client_thread) for _ in range(clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(Engine, "before_cursor_execute", counter)
+
+    if failures:
+        raise RuntimeError(f"{len(failures)} requests failed: {failures[:5]}")
+    return counter.statements, counter.item_reads, elapsed
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    num_items = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+
+    app = make_app()
+    with app.app_context(), db.engine.begin() as connection:
+        seed_database(connection, num_projects=20, items_per_project=num_items // 20, num_users=1, views_per_user=1)
+
+    print(f"{'mode':>8} {'clients':>8} {'statements':>11} {'item reads':>11} {'seconds':>9}")
+    for mode in MODES:
+        statements, item_reads, elapsed = run(mode, clients)
+        print(f"{mode:>8} {clients:>8} {statements:>11} {item_reads:>11} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
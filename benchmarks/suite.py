@@ -0,0 +1,180 @@
+"""Benchmark suite for the API and dashboard hot paths.
+
+Times get_user_projects, get_project_items and create_item, each called
+directly inside a request context and through the Flask test client, and the
+server-side dashboard callbacks (the overview's update_dashboard and the
+project dashboard's load_project_data) through Dash's public
+/_dash-update-component endpoint, as the browser calls them. Requests target
+the user with the most views and the project with the most items. The
+response cache is disabled unless --cached is given, so every run does the
+full work.
+
+Uses the data already in DATABASE_URI, see benchmarks.seed. Without
+DATABASE_URI, or when the database is empty, a skewed portfolio is seeded
+first. Results are written as JSON; --compare prints the change in median
+time against an earlier results file.
+
+    python -m benchmarks.suite [--runs N] [--output results.json] [--compare before.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+
+from app import db
+from app.models import Items, Projects, Views
+from app.routes import create_item, get_project_items, get_user_projects
+from benchmarks.clients import make_app, overview_dashboard, project_dashboard
+from benchmarks.synthetic import seed_skewed
+
+NEW_ITEM = {
+    "item_name": "Benchmark item",
+    "type": "cost",
+    "amount": 1000,
+    "category": "operations",
+    "item_tag": "",
+    "startDate": "2025-01-01",
+    "endDate": "2025-06-30",
+}
+
+
+def call_view(app, view, path, **request_args):
+    with app.test_request_context(path, **request_args):
+        response = view()
+        status = response[1] if isinstance(response, tuple) else response.status_code
+        assert status < 400, response
+
+
+def check(response):
+    assert response.status_code < 400, response.status_code
+
+
+def timings(function, runs):
+    # One warm-up call, then runs timed calls
+    function()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "runs": runs,
+        "min": samples[0],
+        "median": statistics.median(samples),
+        "p95": samples[min(int(runs * 0.95), runs - 1)],
+        "mean": statistics.fmean(samples),
+    }
+
+
+def targets(app):
+    # The heaviest user and project, the paths that degrade first
+    with app.app_context():
+        username = db.session.execute(
+            select(Views.user_id).group_by(Views.user_id).order_by(func.count().desc()).limit(1)).scalar()
+        project_id = db.session.execute(
+            select(Items.project_id).group_by(Items.project_id).order_by(func.count().desc()).limit(1)).scalar()
+    return username, project_id
+
+
+def cases(app, username, project_id):
+    client = app.test_client()
+    new_item = dict(NEW_ITEM, project_id=project_id)
+
+    # create_item comes last so the items it adds do not change the reads
+    return {
+        "get_user_projects/direct": lambda: call_view(
+            app, get_user_projects, f"/api/user_projects?username={username}"),
+        "get_user_projects/client": lambda: check(client.get(f"/api/user_projects?username={username}")),
+        "get_project_items/direct": lambda: call_view(
+            app, get_project_items, f"/api/project_items?projectId={project_id}"),
+        "get_project_items/client": lambda: check(client.get(f"/api/project_items?projectId={project_id}")),
+        "overview.update_dashboard grouped/client": lambda: check(overview_dashboard(
+            client, changed=["project-dropdown.value"])),
+        "overview.update_dashboard items/client": lambda: check(overview_dashboard(
+            client, group=False, changed=["group-by-category.value"])),
+        "project.load_project_data/client": lambda: check(project_dashboard(client, project_id, start_date=None,
+                                                                            end_date=None)),
+        "create_item/direct": lambda: call_view(app, create_item, "/api/items", method="POST", json=new_item),
+        "create_item/client": lambda: check(client.post("/api/items", json=new_item)),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def describe(app, args):
+    with app.app_context():
+        counts = {model.__tablename__: db.session.query(model).count() for model in (Projects, Items, Views)}
+        dialect = db.engine.dialect.name
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "database": dialect,
+        "rows": counts,
+        "cached": args.cached,
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    print(f"\nCompared with {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    print(f"{'case':<44} {'before ms':>10} {'after ms':>10} {'change':>8}")
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        change = result["median"] / before["median"] - 1
+        print(f"{name:<44} {before['median'] * 1000:>10.2f} {result['median'] * 1000:>10.2f} {change:>+8.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--cached", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--projects", type=int, default=200, help="projects to seed into an empty database")
+    parser.add_argument("--items", type=int, default=100_000, help="items to seed into an empty database")
+    parser.add_argument("--users", type=int, default=100, help="users to seed into an empty database")
+    args = parser.parse_args()
+
+    if not args.cached:
+        os.environ["CACHE_DISABLED"] = "1"
+    app = make_app()
+    with app.app_context():
+        if db.session.query(Projects).first() is None:
+            with db.engine.begin() as connection:
+                seed_skewed(connection, args.projects, args.items, args.users, log=lambda message: None)
+
+    meta = describe(app, args)
+    username, project_id = targets(app)
+    results = {}
+    print(f"{'case':<44} {'median ms':>10} {'p95 ms':>10}")
+    for name, function in cases(app, username, project_id).items():
+        results[name] = timings(function, args.runs)
+        print(f"{name:<44} {results[name]['median'] * 1000:>10.2f} {results[name]['p95'] * 1000:>10.2f}")
+
+    with open(args.output, "w") as output:
+        json.dump({"meta": meta, "results": results}, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
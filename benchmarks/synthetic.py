@@ -0,0 +1,206 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, insert, select, text
+
+from app.dashboards.figures import CATEGORY_COLORS
+
+CATEGORIES = list(CATEGORY_COLORS)
+TYPES = ["cost", "budget"]
+
+# Skewed portfolio: most items are costs, a few categories dominate, project
+# sizes and user portfolios follow a long tail
+CATEGORY_WEIGHTS = [0.35, 0.2, 0.2, 0.05, 0.15, 0.05]
+TYPE_WEIGHTS = [0.8, 0.2]
+ITEM_TAGS = ["", "", "", "capex", "opex", "q1", "q2", "q3", "q4"]
+PORTFOLIO_START = np.datetime64("2023-01-01")
+PORTFOLIO_DAYS = 4 * 365
+SEED_CHUNK_SIZE = 50_000
+
+
+def make_items_frame(num_items, seed=0):
+    # Synthetic dashboard frame with the same columns the Dash callbacks build
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, num_items), unit="D")
+    end = start + pd.to_timedelta(rng.integers(1, 365, num_items), unit="D")
+
+    return pd.DataFrame({
+        "Project": "Project " + pd.Series(rng.integers(0, 20, num_items)).astype(str),
+        "Item Name": "Item " + pd.Series(np.arange(num_items)).astype(str),
+        "Type": rng.choice(TYPES, num_items),
+        "Amount": rng.integers(100, 100_000, num_items),
+        "Category": rng.choice(CATEGORIES, num_items),
+        "Start Date": start,
+        "End Date": end,
+    })
+
+
+def sync_project_sequence(connection):
+    # Seeded projects carry explicit ids, so move the Postgres sequence past them
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(
+            "SELECT setval(pg_get_serial_sequence('projects', 'project_id'), "
+            "(SELECT coalesce(max(project_id), 1) FROM projects))"))
+
+
+def seed_database(connection, num_projects, items_per_project, num_users, views_per_user, seed=0):
+    # Bulk-load synthetic projects, items and views through Core inserts
+    from app.models import Items, Projects, Views
+    from app.rollup import add_to_rollup
+
+    rng = np.random.default_rng(seed)
+    first_project = (connection.execute(select(func.max(Projects.project_id))).scalar() or 0) + 1
+    project_ids = np.arange(first_project, first_project + num_projects)
+
+    connection.execute(insert(Projects.__table__), [
+        {
+            "project_id": int(project_id),
+            "project_name": f"Project {project_id}",
+            "status": "active",
+            "tag": "",
+            "proj_start_date": datetime(2025, 1, 1),
+            "proj_end_date": datetime(2026, 12, 31),
+        }
+        for project_id in project_ids
+    ])
+
+    num_items = num_projects * items_per_project
+    frame = make_items_frame(num_items, seed)
+    frame["project_id"] = np.repeat(project_ids, items_per_project)
+    rows = [
+        {
+            "item_name": name,
+            "type": item_type,
+            "project_id": int(project_id),
+            "amount": int(amount),
+            "category": category,
+            "item_tag": "",
+            "item_start_date": start.to_pydatetime(),
+            "item_end_date": end.to_pydatetime(),
+        }
+        for name, item_type, project_id, amount, category, start, end in zip(
+            frame["Item Name"], frame["Type"], frame["project_id"], frame["Amount"],
+            frame["Category"], frame["Start Date"], frame["End Date"])
+    ]
+    for offset in range(0, len(rows), 10_000):
+        connection.execute(insert(Items.__table__), rows[offset:offset + 10_000])
+    # Core inserts bypass the rollup's flush listener, so fill in the new projects' buckets
+    add_to_rollup(connection, rows)
+
+    views = [
+        {
+            "user_id": f"user-{user}",
+            "project_id": int(project_id),
+            "bookmark": True,
+            "read": True,
+            "write": True,
+            "delete": False,
+            "archive": False,
+        }
+        for user in range(num_users)
+        for project_id in rng.choice(project_ids, min(views_per_user, num_projects), replace=False)
+    ]
+    for offset in range(0, len(views), 10_000):
+        connection.execute(insert(Views.__table__), views[offset:offset + 10_000])
+
+    sync_project_sequence(connection)
+    return project_ids
+
+
+def long_tail(rng, size, sigma):
+    # Lognormal weights normalised to sum to 1, sorted so the first are the largest
+    weights = np.sort(rng.lognormal(0, sigma, size))[::-1]
+    return weights / weights.sum()
+
+
+def seed_skewed(connection, num_projects, num_items, num_users, seed=0, log=print):
+    # Projects, items and views with realistic skew, written in chunks of
+    # SEED_CHUNK_SIZE rows so millions of items fit in bounded memory. Items
+    # go through app.ingest.insert_items, i.e. COPY on Postgres, and keep the
+    # monthly rollup up to date. Returns the new project ids, largest first.
+    from app.ingest import insert_items
+    from app.models import Projects, Views
+
+    rng = np.random.default_rng(seed)
+    first_project = (connection.execute(select(func.max(Projects.project_id))).scalar() or 0) + 1
+    project_ids = np.arange(first_project, first_project + num_projects)
+
+    # A few large programmes and a long tail of small projects
+    items_per_project = rng.multinomial(num_items, long_tail(rng, num_projects, 1.5))
+    start_days = rng.integers(0, PORTFOLIO_DAYS - 90, num_projects)
+    project_starts = PORTFOLIO_START + start_days
+    project_days = np.minimum(rng.integers(90, 3 * 365, num_projects), PORTFOLIO_DAYS - start_days)
+
+    for offset in range(0, num_projects, SEED_CHUNK_SIZE):
+        chunk = slice(offset, offset + SEED_CHUNK_SIZE)
+        connection.execute(insert(Projects.__table__), [
+            {
+                "project_id": int(project_id),
+                "project_name": f"Project {project_id}",
+                "status": status,
+                "tag": "",
+                "proj_start_date": start,
+                "proj_end_date": start + timedelta(days=int(days)),
+            }
+            for project_id, status, start, days in zip(
+                project_ids[chunk], rng.choice(["active", "planned", "closed"], len(project_ids[chunk]), p=[0.6, 0.2, 0.2]),
+                project_starts[chunk].astype("datetime64[us]").tolist(), project_days[chunk])
+        ])
+
+    # Items are generated in chunks of item indexes; each item lies within its project
+    boundaries = np.cumsum(items_per_project)
+    written = 0
+    for offset in range(0, num_items, SEED_CHUNK_SIZE):
+        owners = np.searchsorted(boundaries, np.arange(offset, min(offset + SEED_CHUNK_SIZE, num_items)), side="right")
+        size = len(owners)
+
+        offsets = (rng.random(size) * project_days[owners]).astype(np.int64)
+        starts = project_starts[owners] + offsets
+        ends = starts + np.minimum(rng.geometric(1 / 60, size), project_days[owners] - offsets)
+        rows = [
+            {
+                "item_name": f"Item {offset + index}",
+                "type": item_type,
+                "project_id": int(project_ids[owner]),
+                "amount": int(amount),
+                "category": category,
+                "item_tag": tag,
+                "item_start_date": start,
+                "item_end_date": end,
+            }
+            for index, (owner, item_type, amount, category, tag, start, end) in enumerate(zip(
+                owners,
+                rng.choice(TYPES, size, p=TYPE_WEIGHTS),
+                np.ceil(rng.lognormal(8.5, 1.2, size)),
+                rng.choice(CATEGORIES, size, p=CATEGORY_WEIGHTS),
+                rng.choice(ITEM_TAGS, size),
+                starts.astype("datetime64[us]").tolist(),
+                ends.astype("datetime64[us]").tolist()))
+        ]
+        written += insert_items(connection, rows)
+        log(f"{written} of {num_items} items")
+
+    # Most users follow a handful of projects, a few see a large share of the portfolio
+    views_per_user = np.sort(np.clip(np.ceil(rng.lognormal(1.5, 1.2, num_users)), 1, num_projects).astype(np.int64))[::-1]
+    project_weights = long_tail(rng, num_projects, 1.0)
+    views = []
+    for user, count in enumerate(views_per_user):
+        for project_id in np.unique(rng.choice(project_ids, count, p=project_weights)):
+            views.append({
+                "user_id": f"user-{user}",
+                "project_id": int(project_id),
+                "bookmark": True,
+                "read": True,
+                "write": True,
+                "delete": False,
+                "archive": False,
+            })
+        if len(views) >= SEED_CHUNK_SIZE:
+            connection.execute(insert(Views.__table__), views)
+            views = []
+    if views:
+        connection.execute(insert(Views.__table__), views)
+
+    sync_project_sequence(connection)
+    return project_ids
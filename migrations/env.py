@@ -82,6 +82,10 @@ def run_migrations_online():
         )
 
         with context.begin_transaction():
+            # A long migration must not be cut off by the app's statement_timeout
+            # (DB_STATEMENT_TIMEOUT_MS) or one configured for the database or role
+            if connection.dialect.name == 'postgresql':
+                connection.exec_driver_sql("SET LOCAL statement_timeout = 0")
             context.run_migrations()
 
 
@@ -0,0 +1,29 @@
+"""per-project data version for ETags
+
+Revision ID: 2e6ab08d1e2c
+Revises: cab5f36e174a
+Create Date: 2025-02-11 09:27:53.402196
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e6ab08d1e2c'
+down_revision = 'cab5f36e174a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # app.schema.ensure_schema runs db.create_all() before upgrade(), so the column may already exist
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('projects')}
+    if 'data_version' not in columns:
+        with op.batch_alter_table('projects', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('data_version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
@@ -0,0 +1,37 @@
+"""indexes for user project and item lookups
+
+Revision ID: cab5f36e174a
+Revises: dbc324da5cc6
+Create Date: 2025-02-06 16:41:09.530217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cab5f36e174a'
+down_revision = 'dbc324da5cc6'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_views_user_id_project_id', 'views', ['user_id', 'project_id']),
+    ('ix_items_project_type_category_dates', 'items',
+     ['project_id', 'type', 'category', 'item_start_date', 'item_end_date']),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    # app.schema.ensure_schema runs db.create_all() before upgrade(), so the indexes may already exist
+    for name, table, columns in INDEXES:
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        if name not in existing:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, columns in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,94 @@
+"""monthly item rollup table
+
+Revision ID: dbc324da5cc6
+Revises: 1877c1017f55
+Create Date: 2025-02-03 10:12:45.118402
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'dbc324da5cc6'
+down_revision = '1877c1017f55'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # app.schema.ensure_schema runs db.create_all() before upgrade(), so the table may already exist
+    if not sa.inspect(bind).has_table('item_rollup'):
+        op.create_table('item_rollup',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('month', sa.DateTime(), nullable=False),
+        sa.Column('amount', sa.BigInteger(), nullable=True),
+        sa.Column('item_count', sa.Integer(), nullable=True),
+        sa.Column('min_start_date', sa.DateTime(), nullable=True),
+        sa.Column('max_end_date', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.project_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id', 'category', 'type', 'month')
+        )
+
+    if bind.execute(sa.text('SELECT COUNT(*) FROM item_rollup')).scalar():
+        return
+
+    # Backfill the rollup from existing items
+    if bind.dialect.name == 'postgresql':
+        op.execute("""
+            INSERT INTO item_rollup (project_id, category, type, month, amount, item_count, min_start_date, max_end_date)
+            SELECT project_id, category, type, date_trunc('month', item_start_date),
+                   SUM(amount), COUNT(*), MIN(item_start_date), MAX(item_end_date)
+            FROM items
+            WHERE project_id IS NOT NULL AND category IS NOT NULL AND type IS NOT NULL AND item_start_date IS NOT NULL
+            GROUP BY project_id, category, type, date_trunc('month', item_start_date)
+        """)
+        return
+
+    buckets = {}
+    rows = bind.execute(sa.text(
+        'SELECT project_id, category, type, amount, item_start_date, item_end_date FROM items '
+        'WHERE project_id IS NOT NULL AND category IS NOT NULL AND type IS NOT NULL AND item_start_date IS NOT NULL'
+    ))
+    for project_id, category, item_type, amount, start_date, end_date in rows:
+        if isinstance(start_date, str):
+            start_date = datetime.fromisoformat(start_date)
+        if isinstance(end_date, str):
+            end_date = datetime.fromisoformat(end_date)
+        key = (project_id, category, item_type, datetime(start_date.year, start_date.month, 1))
+        bucket = buckets.setdefault(key, [0, 0, start_date, end_date])
+        bucket[0] += amount or 0
+        bucket[1] += 1
+        bucket[2] = min(bucket[2], start_date)
+        if end_date is not None:
+            bucket[3] = max(bucket[3], end_date) if bucket[3] is not None else end_date
+
+    rollup = sa.table('item_rollup',
+        sa.column('project_id', sa.Integer()),
+        sa.column('category', sa.String()),
+        sa.column('type', sa.String()),
+        sa.column('month', sa.DateTime()),
+        sa.column('amount', sa.BigInteger()),
+        sa.column('item_count', sa.Integer()),
+        sa.column('min_start_date', sa.DateTime()),
+        sa.column('max_end_date', sa.DateTime()),
+    )
+    if buckets:
+        op.bulk_insert(rollup, [
+            {
+                'project_id': key[0], 'category': key[1], 'type': key[2], 'month': key[3],
+                'amount': bucket[0], 'item_count': bucket[1],
+                'min_start_date': bucket[2], 'max_end_date': bucket[3],
+            }
+            for key, bucket in buckets.items()
+        ])
+
+
+def downgrade():
+    op.drop_table('item_rollup')